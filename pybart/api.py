@@ -1,35 +1,181 @@
 import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat, islice
 
-from .conllu_wrapper import parse_conllu, serialize_conllu, parse_odin, conllu_to_odin, parse_spike_sentence, fix_spike_graph, parsed_tacred_json
-from .converter import Convert, get_conversion_names as inner_get_conversion_names, init_conversions
+from .conllu_wrapper import iter_conllu_sentences, parse_conllu, serialize_conllu, parse_odin, conllu_to_odin, parse_spike_sentence, fix_spike_graph, parsed_tacred_json
+from .converter import Convert, get_conversion_names as inner_get_conversion_names, get_initialized_conversions
+from .graph_token import sentence_to_state, sentence_from_state
 from spacy.language import Language
-from .spacy_wrapper import parse_spacy_sent, enhance_to_spacy_doc
+from spacy.util import minibatch
+from .spacy_wrapper import parse_spacy_sent, enhance_to_spacy_doc, GRAPHS_KEY, ADDED_NODES_KEY, LAZY_CONFIG_KEY
 
 
-def convert_bart_conllu(conllu_text, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, preserve_comments=False, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1):
+# ------------------------------------------------ multiprocessing ------------------------------------------------- #
+# sentences are converted independently, apart from the iids (alternatives ids) which are numbered per conversion run,
+#   so each chunk is converted by its own run in a worker, and the iids are shifted back in the parent process,
+#   by the number of iids used by the previous chunks. This keeps the output the same as of a single run.
+
+
+def _get_workers(workers):
+    return os.cpu_count() if workers is None else workers
+
+
+def _get_chunks(items, workers):
+    chunk_size = max(1, math.ceil(len(items) / (workers * 4)))
+    return [items[i: i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def _init_worker(remove_node_adding_conversions, ud_version):
+    # one time initialization of the conversions (and their matcher) per worker process
+    get_initialized_conversions(remove_node_adding_conversions, ud_version)
+
+
+def _get_executor(workers, remove_node_adding_conversions, ud_version):
+    # initialize in the parent as well, so forked workers start with the conversions ready
+    _init_worker(remove_node_adding_conversions, ud_version)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(remove_node_adding_conversions, ud_version))
+
+
+def _imap(executor, workers, func, items, *args):
+    # like executor.map, but submits the items only a bounded number ahead of the yielded results,
+    #   so an items iterator is consumed lazily
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item, *args))
+        if len(pending) >= workers * 2:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _has_iids(sentence):
+    return any(rel.iid is not None for token in sentence for _, rels in token.get_new_relations() for rel in rels)
+
+
+def _convert_chunk(parse, data, config):
+    con = Convert(parse(data), *config)
+    converted, _ = con()
+    return [sentence_to_state(sentence) for sentence in converted], len(con.iids)
+
+
+def _convert_in_workers(parse, chunks, config, workers):
+    converted = []
+    iids_offset = 0
+    with _get_executor(workers, config[6], config[10]) as executor:
+        for states, iids_count in executor.map(_convert_chunk, repeat(parse), chunks, repeat(config)):
+            converted.extend(sentence_from_state(state, iids_offset) for state in states)
+            iids_offset += iids_count
+    return converted
+
+
+def _convert_conllu_chunk(conllu_text, config, preserve_comments):
+    parsed, all_comments = parse_conllu(conllu_text)
+    con = Convert(parsed, *config)
+    converted, _ = con()
+    # each sentence is serialized in the worker, and is passed as a state as well only if its iids may need a shift
+    return [(serialize_conllu([sentence], [comments], config[4], config[5], preserve_comments), comments,
+             sentence_to_state(sentence) if _has_iids(sentence) else None)
+            for sentence, comments in zip(converted, all_comments)], len(con.iids)
+
+
+def _iter_shifted_conllu(chunks_results, config, preserve_comments):
+    iids_offset = 0
+    for results, iids_count in chunks_results:
+        for text, comments, state in results:
+            if iids_offset and state is not None:
+                text = serialize_conllu([sentence_from_state(state, iids_offset)], [comments], config[4], config[5], preserve_comments)
+            yield text
+        iids_offset += iids_count
+
+
+def _iter_convert_conllu_chunks(chunks, config, preserve_comments, workers):
+    # yields the serialized sentences of the (CoNLL-U text) chunks by their order
+    if workers > 1:
+        with _get_executor(workers, config[6], config[10]) as executor:
+            yield from _iter_shifted_conllu(_imap(executor, workers, _convert_conllu_chunk, chunks, config, preserve_comments), config, preserve_comments)
+    else:
+        yield from _iter_shifted_conllu(map(_convert_conllu_chunk, chunks, repeat(config), repeat(preserve_comments)), config, preserve_comments)
+
+
+def _convert_bart_conllu_in_workers(conllu_text, config, preserve_comments, workers):
+    chunks = ["\n\n".join(chunk) for chunk in _get_chunks(conllu_text.strip().split('\n\n'), workers)]
+    return "\n".join(_iter_convert_conllu_chunks(chunks, config, preserve_comments, workers))
+
+
+# ---------------------------------------------------------------------------------------------------------------- #
+
+
+def convert_bart_conllu(conllu_text, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, preserve_comments=False, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, workers=1):
+    # workers - the number of processes to convert with (None for one per core)
+    workers = _get_workers(workers)
+    if workers > 1:
+        config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+        return _convert_bart_conllu_in_workers(conllu_text, config, preserve_comments, workers)
     parsed, all_comments = parse_conllu(conllu_text)
     con = Convert(parsed, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
     converted, _ = con()
     return serialize_conllu(converted, all_comments, remove_eud_info, remove_extra_info, preserve_comments)
 
 
-def _convert_bart_odin_sent(doc, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version):
+def iter_convert_bart_conllu(conllu_lines, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, preserve_comments=False, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, workers=1, chunk_size=256):
+    # conllu_lines - an iterable of CoNLL-U formatted lines (e.g. an open file), which is read lazily,
+    #   chunk_size sentences at a time (and a bounded number of chunks ahead when converting in workers).
+    # yields the converted sentences one by one, each as a CoNLL-U formatted text,
+    #   so joined by "\n" they are the same as the output of convert_bart_conllu for the entire text.
+    workers = _get_workers(workers)
+    config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+    sentences = iter_conllu_sentences(conllu_lines)
+    chunks = iter(lambda: "\n\n".join(islice(sentences, chunk_size)), "")
+    yield from _iter_convert_conllu_chunks(chunks, config, preserve_comments, workers)
+
+
+def _convert_bart_odin_sent(doc, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version, workers=1):
+    if workers > 1:
+        config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+        converted_sents = _convert_in_workers(parse_odin, [{"sentences": chunk} for chunk in _get_chunks(doc["sentences"], workers)], config, workers)
+        return conllu_to_odin(converted_sents, doc, remove_eud_info, remove_extra_info)
     sents = parse_odin(doc)
     con = Convert(sents, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
     converted_sents, _ = con()
     return conllu_to_odin(converted_sents, doc, remove_eud_info, remove_extra_info)
 
 
-def convert_bart_odin(odin_json, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1):
+def _convert_bart_odin_doc(doc, config):
+    return _convert_bart_odin_sent(doc, *config)
+
+
+def convert_bart_odin(odin_json, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, workers=1):
+    # workers - the number of processes to convert with (None for one per core)
+    workers = _get_workers(workers)
+    config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
     if "documents" in odin_json:
-        for doc_key, doc in odin_json["documents"].items():
-            odin_json["documents"][doc_key] = _convert_bart_odin_sent(doc, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+        doc_keys = list(odin_json["documents"].keys())
+        for doc_key, doc in zip(doc_keys, iter_convert_bart_odin([odin_json["documents"][doc_key] for doc_key in doc_keys], *config, workers)):
+            odin_json["documents"][doc_key] = doc
     else:
-        odin_json = _convert_bart_odin_sent(odin_json, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+        odin_json = _convert_bart_odin_sent(odin_json, *config, workers)
 
     return odin_json
 
 
+def iter_convert_bart_odin(odin_docs, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, workers=1):
+    # odin_docs - an iterable of Odin documents (e.g. the parsed lines of a JSON Lines file, or the values of a documents mapping),
+    #   which is read lazily (and a bounded number of documents ahead when converting in workers).
+    # yields the converted documents by their order. each document is converted by its own run, as in convert_bart_odin,
+    #   (so documents are simply converted by different workers), and is updated in place unless converted in a worker.
+    workers = _get_workers(workers)
+    config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+    if workers > 1:
+        with _get_executor(workers, remove_node_adding_conversions, ud_version) as executor:
+            yield from _imap(executor, workers, _convert_bart_odin_doc, odin_docs, config)
+    else:
+        for doc in odin_docs:
+            yield _convert_bart_odin_doc(doc, config)
+
+
 def _inner_convert_spike_sentence(spike_sentence, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version):
     sents = [parse_spike_sentence(spike_sentence)]
     con = Convert(sents, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
@@ -42,7 +188,45 @@ def convert_spike_sentence(spike_sentence, enhance_ud=True, enhanced_plus_plus=T
     return fix_spike_graph(converted_sents[0], spike_sentence, remove_eud_info, remove_extra_info, graph_to_replace)
 
 
-def convert_bart_tacred(tacred_json, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1):
+def _get_spike_sentences(spike_item):
+    # a SPIKE sentence, or a document of SPIKE sentences
+    return spike_item["sentences"] if "sentences" in spike_item else [spike_item]
+
+
+def _convert_spike_chunk(spike_items, config, graph_to_replace):
+    for spike_item in spike_items:
+        for spike_sentence in _get_spike_sentences(spike_item):
+            # each sentence is converted by its own run (which takes the conversions from the registry),
+            #   so its iids are numbered from the start, as in convert_spike_sentence
+            converted_sents, _ = _inner_convert_spike_sentence(spike_sentence, *config)
+            fix_spike_graph(converted_sents[0], spike_sentence, config[4], config[5], graph_to_replace)
+    return spike_items
+
+
+def iter_convert_spike_sentences(spike_items, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, graph_to_replace="universal-enhanced", workers=1, chunk_size=256):
+    # spike_items - an iterable of SPIKE sentences, or of SPIKE documents (having a list of sentences), which is read lazily,
+    #   chunk_size items at a time (and a bounded number of chunks ahead when converting in workers).
+    #   each sentence's graph_to_replace is filled, the same as by convert_spike_sentence.
+    # yields the converted items by their order, which are updated in place unless converted in a worker.
+    workers = _get_workers(workers)
+    config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+    spike_items = iter(spike_items)
+    chunks = iter(lambda: list(islice(spike_items, chunk_size)), [])
+    if workers > 1:
+        with _get_executor(workers, remove_node_adding_conversions, ud_version) as executor:
+            for converted_items in _imap(executor, workers, _convert_spike_chunk, chunks, config, graph_to_replace):
+                yield from converted_items
+    else:
+        for chunk in chunks:
+            yield from _convert_spike_chunk(chunk, config, graph_to_replace)
+
+
+def convert_bart_tacred(tacred_json, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, workers=1):
+    # workers - the number of processes to convert with (None for one per core)
+    workers = _get_workers(workers)
+    if workers > 1:
+        config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+        return _convert_in_workers(parsed_tacred_json, _get_chunks(tacred_json, workers), config, workers)
     sents = parsed_tacred_json(tacred_json)
     con = Convert(sents, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
     converted_sents, _ = con()
@@ -50,35 +234,101 @@ def convert_bart_tacred(tacred_json, enhance_ud=True, enhanced_plus_plus=True, e
     return converted_sents
 
 
-def convert_spacy_doc(doc, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, one_time_initialized_conversions=None):
+def convert_spacy_doc(doc, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, one_time_initialized_conversions=None, one_time_initialized_matcher=None):
     parsed_doc = [parse_spacy_sent(sent) for sent in doc.sents]
-    con = Convert(parsed_doc, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version, one_time_initialized_conversions)
+    con = Convert(parsed_doc, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version, one_time_initialized_conversions, one_time_initialized_matcher)
     converted, convs_done = con()
     enhance_to_spacy_doc(doc, converted, remove_eud_info, remove_extra_info)
     return converted, convs_done
 
 
+def _renumber_iids(sentences, iids):
+    # the iids are numbered per conversion run, one sentence after the other. so the iids of sentences that were converted
+    #   after others are shifted back by the first of them, as if they were converted by their own run.
+    offset = min((iids[token] for sentence in sentences for token in sentence if token in iids), default=0)
+    if offset:
+        # a label may be shared by edges, so each label is shifted once
+        for rel in {id(rel): rel for sentence in sentences for token in sentence for _, rels in token.get_new_relations() for rel in rels if rel.iid is not None}.values():
+            rel.iid -= offset
+
+
+def convert_spacy_docs(docs, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1):
+    # converts the sentences of all the docs by a single run, with the same result per doc as convert_spacy_doc.
+    # returns the converted sentences per doc, and the maximal number of iterations done.
+    parsed_docs = [[parse_spacy_sent(sent) for sent in doc.sents] for doc in docs]
+    con = Convert([sent for parsed_doc in parsed_docs for sent in parsed_doc], enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+    converted, convs_done = con()
+    converted_per_doc = []
+    start = 0
+    for doc, parsed_doc in zip(docs, parsed_docs):
+        doc_converted = converted[start: start + len(parsed_doc)]
+        start += len(parsed_doc)
+        _renumber_iids(doc_converted, con.iids)
+        enhance_to_spacy_doc(doc, doc_converted, remove_eud_info, remove_extra_info)
+        converted_per_doc.append(doc_converted)
+    return converted_per_doc, convs_done
+
+
+def _set_lazy_conversion(doc, config):
+    # the previous conversion of the doc (if any) is replaced by the lazy one
+    doc.user_data.pop(GRAPHS_KEY, None)
+    doc.user_data.pop(ADDED_NODES_KEY, None)
+    doc.user_data[LAZY_CONFIG_KEY] = list(config)
+
+
 class Converter:
-    def __init__(self, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, is_spike_converter=False):
+    def __init__(self, enhance_ud=True, enhanced_plus_plus=True, enhanced_extra=True, conv_iterations=math.inf, remove_eud_info=False, remove_extra_info=False, remove_node_adding_conversions=False, remove_unc=False, query_mode=False, funcs_to_cancel=None, ud_version=1, is_spike_converter=False, lazy=False):
         self.config = (enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
         self.is_spike_converter = is_spike_converter
+        # lazy - only record the configuration in each doc, and convert it the first time its graphs are accessed
+        self.lazy = lazy
         # make conversions and (more importantly) constraint initialization, a one timer.
-        self.conversions = init_conversions(remove_node_adding_conversions, ud_version)
+        #   these are taken from the conversions registry, which is also used (implicitly) by each conversion call.
+        self.conversions, self.matcher = get_initialized_conversions(remove_node_adding_conversions, ud_version)
+        # the results of the last call, per thread, for get_converted_sents and get_max_convs (see convert).
+        self._last_results = threading.local()
 
-    def __call__(self, doc):
+    # pickle only the configuration, and rebuild from it (and the conversions registry) when unpickled,
+    #   as the conversions are closures, and the compiled matcher is cheaper to take from the registry than to copy.
+    #   This makes a converter safe to send to workers of any start method (including 'spawn').
+    def __reduce__(self):
+        return self.__class__, (*self.config, self.is_spike_converter, self.lazy)
+
+    def convert(self, doc):
+        # converts the doc as __call__ does, and returns this call's converted sentences and the maximal number of
+        #   iterations done (both None for a lazy converter). All the state of a call is local to it, so a single
+        #   converter can serve concurrent calls from multiple threads.
         if self.is_spike_converter:
-            converted_sents, convs_done = _inner_convert_spike_sentence(doc, *self.config)
+            return _inner_convert_spike_sentence(doc, *self.config)
+        elif self.lazy:
+            _set_lazy_conversion(doc, self.config)
+            return None, None
         else:
-            converted_sents, convs_done = convert_spacy_doc(doc, *self.config, self.conversions)
-        self._converted_sents = converted_sents
-        self._convs_done = convs_done
+            return convert_spacy_doc(doc, *self.config)
+
+    def __call__(self, doc):
+        self._last_results.converted_sents, self._last_results.convs_done = self.convert(doc)
         return doc
 
+    def pipe(self, stream, batch_size=128):
+        # the docs of each batch are converted together (see convert_spacy_docs). The converted graphs are stored in the
+        #   docs' user_data, so they are passed along with the docs between the processes of nlp.pipe (for n_process > 1).
+        for docs in minibatch(stream, size=batch_size):
+            if self.is_spike_converter or self.lazy:
+                yield from (self(doc) for doc in docs)
+                continue
+            converted_per_doc, convs_done = convert_spacy_docs(docs, *self.config)
+            self._last_results.converted_sents = [sent for converted_sents in converted_per_doc for sent in converted_sents]
+            self._last_results.convs_done = convs_done
+            yield from docs
+
+    # these return the results of the calling thread's last call (or batch). Prefer the results returned by convert,
+    #   which don't depend on what else was converted in the same thread since.
     def get_converted_sents(self):
-        return self._converted_sents
+        return getattr(self._last_results, "converted_sents", None)
 
     def get_max_convs(self):
-        return self._convs_done
+        return getattr(self._last_results, "convs_done", None)
 
 
 def get_conversion_names():
@@ -87,7 +337,7 @@ def get_conversion_names():
 
 @Language.factory(
    "pybart_spacy_pipe",
-   default_config={"enhance_ud": True, "enhanced_plus_plus": True, "enhanced_extra": True, "conv_iterations": math.inf, "remove_eud_info": False, "remove_extra_info": False, "remove_node_adding_conversions": False, "remove_unc": False, "query_mode": False, "funcs_to_cancel": None, "ud_version": 1},
+   default_config={"enhance_ud": True, "enhanced_plus_plus": True, "enhanced_extra": True, "conv_iterations": math.inf, "remove_eud_info": False, "remove_extra_info": False, "remove_node_adding_conversions": False, "remove_unc": False, "query_mode": False, "funcs_to_cancel": None, "ud_version": 1, "lazy": False},
 )
-def create_pybart_spacy_pipe(nlp, name, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version):
-    return Converter(enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version)
+def create_pybart_spacy_pipe(nlp, name, enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version, lazy):
+    return Converter(enhance_ud, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_eud_info, remove_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version, lazy=lazy)
@@ -0,0 +1,235 @@
+import mmap
+import struct
+import sys
+from array import array
+from itertools import repeat
+
+from .graph_token import Label, TokenId, sentence_to_state, sentence_from_state
+
+# a compact binary format of converted sentences:
+#   header: magic, version, the number of sentences, and the offsets of the strings table and of the sentences index.
+#   sentences: per sentence a block of its counts (see SENTENCE_HEADER), the array typecode of each of its columns
+#       (the narrowest one that fits the column's values), and then its columns (see the COLUMNS below).
+#   strings table: the number of strings, their utf-8 lengths and then their utf-8 bytes. all the strings of the
+#       sentences (token fields, label fields and comments) are interned, and are referenced by their 1-based position
+#       in the table (0 stands for None).
+#   sentences index: the offsets of the sentences blocks, and the offset of their end.
+# the columns are stored little-endian.
+MAGIC = b"PBBG"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQQ")
+SENTENCE_HEADER = struct.Struct("<IIII")
+STRINGS_HEADER = struct.Struct("<Q")
+
+TOKEN_STRING_FIELDS = ("form", "lemma", "upos", "xpos", "feats", "deprel", "misc")
+LABEL_STRING_FIELDS = ("base", "eud", "src", "src_type", "phrase")
+# (column name, whether it is signed) by their order in a sentence block. the ids of the tokens and their heads
+#   (in the CoNLL-U sense) are split into major and minor columns, where a head major of -1 stands for None,
+#   and of -2 for a string head (i.e. '_' of copy nodes), given by the string id in the head minor.
+#   an edge connects the tokens in the child and head positions (where the tokens that are heads outside the sentence,
+#   e.g. the root, are stored after the sentence), and an iid of -1 stands for None.
+COMMENT_COLUMNS = [("comments", False)]
+TOKEN_COLUMNS = [("id_major", True), ("id_minor", False), ("head_major", True), ("head_minor", False)] + [(name, False) for name in TOKEN_STRING_FIELDS]
+EDGE_COLUMNS = [("child", False), ("head", False)] + [(name, False) for name in LABEL_STRING_FIELDS] + [("uncertain", False), ("iid", True)]
+COLUMNS = COMMENT_COLUMNS + TOKEN_COLUMNS + EDGE_COLUMNS
+
+
+def _get_typecode(values, signed):
+    for typecode in ("bhiq" if signed else "BHIQ"):
+        bits = array(typecode).itemsize * 8
+        low, high = (-(1 << (bits - 1)), 1 << (bits - 1)) if signed else (0, 1 << bits)
+        if all(low <= value < high for value in values):
+            return typecode
+    raise OverflowError("column values are out of the 64 bits range")
+
+
+def _to_bytes(values, typecode):
+    values = array(typecode, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(buffer, typecode):
+    values = array(typecode)
+    values.frombytes(buffer)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class BinaryGraphsWriter:
+    """Purpose: writes converted sentences to a file in the binary format, one at a time.
+
+    Args:
+        (str) The path of the file.
+    """
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        # the header is written on close, when the offsets are known
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._strings = dict()
+        self._offsets = array("Q", [HEADER.size])
+
+    def _intern(self, string):
+        if string is None:
+            return 0
+        if string not in self._strings:
+            self._strings[string] = len(self._strings) + 1
+        return self._strings[string]
+
+    def write(self, sentence, comments=()):
+        """Purpose: writes a sentence (a converted list of tokens) and its comments."""
+        length, tokens_state = sentence_to_state(sentence)
+        columns = {name: [] for name, _ in COLUMNS}
+        columns["comments"] = [self._intern(comment) for comment in comments]
+        for child, (info, edges) in enumerate(tokens_state):
+            columns["id_major"].append(info["id"].major)
+            columns["id_minor"].append(info["id"].minor)
+            if info["head"] is None:
+                columns["head_major"].append(-1)
+                columns["head_minor"].append(0)
+            elif isinstance(info["head"], str):
+                columns["head_major"].append(-2)
+                columns["head_minor"].append(self._intern(info["head"]))
+            else:
+                columns["head_major"].append(info["head"].major)
+                columns["head_minor"].append(info["head"].minor)
+            for name in TOKEN_STRING_FIELDS:
+                columns[name].append(self._intern(info[name]))
+            for head, rels in edges:
+                for rel in rels:
+                    columns["child"].append(child)
+                    columns["head"].append(head)
+                    for name in LABEL_STRING_FIELDS:
+                        columns[name].append(self._intern(getattr(rel, name)))
+                    columns["uncertain"].append(rel.uncertain)
+                    columns["iid"].append(-1 if rel.iid is None else rel.iid)
+
+        self._file.write(SENTENCE_HEADER.pack(length, len(tokens_state), len(comments), len(columns["child"])))
+        typecodes = [_get_typecode(columns[name], signed) for name, signed in COLUMNS]
+        self._file.write("".join(typecodes).encode("ascii"))
+        for (name, _), typecode in zip(COLUMNS, typecodes):
+            self._file.write(_to_bytes(columns[name], typecode))
+        self._offsets.append(self._file.tell())
+
+    def close(self):
+        strings = [string.encode("utf-8") for string in self._strings]
+        strings_offset = self._file.tell()
+        self._file.write(STRINGS_HEADER.pack(len(strings)))
+        self._file.write(_to_bytes([len(string) for string in strings], "I"))
+        self._file.write(b"".join(strings))
+        index_offset = self._file.tell()
+        self._file.write(_to_bytes(self._offsets, "Q"))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(self._offsets) - 1, strings_offset, index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_graphs(path, sentences, all_comments=None):
+    """Purpose: writes converted sentences (and optionally their comments) to a file in the binary format.
+
+    Args:
+        (str) The path of the file.
+        (iterable(list(Token))) The sentences.
+        (iterable(list(str))) The comments per sentence.
+    """
+    with BinaryGraphsWriter(path) as writer:
+        for sentence, comments in zip(sentences, all_comments if all_comments is not None else repeat([])):
+            writer.write(sentence, comments)
+
+
+class BinaryGraphs:
+    """Purpose: random access to the sentences of a file in the binary format.
+
+    The file is memory-mapped, and only its strings table and sentences index are read on opening,
+    the sentences are read on access. It is pickled by its path, so it can be passed to workers.
+
+    Args:
+        (str) The path of the file.
+
+    Raises:
+        ValueError: the file isn't of the binary format, or is of another version of it.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, strings_offset, index_offset = HEADER.unpack(self._mm[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pybart binary graphs file")
+        if version != VERSION:
+            raise ValueError(f"{path} is of version {version} of the binary format, expected version {VERSION}")
+
+        strings_count, = STRINGS_HEADER.unpack(self._mm[strings_offset: strings_offset + STRINGS_HEADER.size])
+        position = strings_offset + STRINGS_HEADER.size
+        lengths = _from_bytes(self._mm[position: position + strings_count * 4], "I")
+        position += strings_count * 4
+        self._strings = [None]
+        for length in lengths:
+            self._strings.append(self._mm[position: position + length].decode("utf-8"))
+            position += length
+        self._offsets = _from_bytes(self._mm[index_offset: index_offset + (count + 1) * 8], "Q")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        """Purpose: reads the i'th sentence.
+
+        returns:
+            (list(Token)) The sentence, as it was written.
+            (list(str)) Its comments.
+        """
+        if not 0 <= i < len(self):
+            raise IndexError(f"sentence {i} out of range")
+        position = self._offsets[i]
+        length, tokens_count, comments_count, edges_count = SENTENCE_HEADER.unpack(self._mm[position: position + SENTENCE_HEADER.size])
+        position += SENTENCE_HEADER.size
+        typecodes = self._mm[position: position + len(COLUMNS)].decode("ascii")
+        position += len(COLUMNS)
+        counts = [comments_count] * len(COMMENT_COLUMNS) + [tokens_count] * len(TOKEN_COLUMNS) + [edges_count] * len(EDGE_COLUMNS)
+        columns = dict()
+        for (name, _), typecode, count in zip(COLUMNS, typecodes, counts):
+            size = array(typecode).itemsize * count
+            columns[name] = _from_bytes(self._mm[position: position + size], typecode)
+            position += size
+        comments = [self._strings[string_id] for string_id in columns["comments"]]
+
+        strings = self._strings
+        tokens_state = []
+        for j in range(tokens_count):
+            fields = {name: strings[columns[name][j]] for name in TOKEN_STRING_FIELDS}
+            head_major, head_minor = columns["head_major"][j], columns["head_minor"][j]
+            head = None if head_major == -1 else strings[head_minor] if head_major == -2 else TokenId(head_major, head_minor)
+            # the deps field isn't stored, as it is rebuilt from the edges on serialization
+            info = {"id": TokenId(columns["id_major"][j], columns["id_minor"][j]), "form": fields["form"], "lemma": fields["lemma"], "upos": fields["upos"],
+                    "xpos": fields["xpos"], "feats": fields["feats"], "head": head, "deprel": fields["deprel"], "deps": "_", "misc": fields["misc"]}
+            tokens_state.append((info, dict()))
+        for k in range(edges_count):
+            rel = Label(*(strings[columns[name][k]] for name in LABEL_STRING_FIELDS), bool(columns["uncertain"][k]), None if columns["iid"][k] == -1 else columns["iid"][k])
+            tokens_state[columns["child"][k]][1].setdefault(columns["head"][k], []).append(rel)
+        return sentence_from_state((length, [(info, edges.items()) for info, edges in tokens_state])), comments
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return self.__class__, (self.path,)
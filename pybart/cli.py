@@ -0,0 +1,181 @@
+import argparse
+import bz2
+import gzip
+import json
+import lzma
+import math
+import os
+import sys
+import time
+
+from .api import iter_convert_bart_conllu, convert_bart_odin, iter_convert_bart_odin, iter_convert_spike_sentences, convert_bart_tacred
+from .conllu_wrapper import serialize_conllu
+
+# the input extensions per format, and the compressions that are (de)compressed transparently by their extension
+FORMAT_EXTENSIONS = {"conllu": (".conllu", ".conll"), "odin": (".json", ".jsonl"), "spike": (".json", ".jsonl"), "tacred": (".json", ".jsonl")}
+COMPRESSIONS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def _open(path, mode):
+    # '-' stands for stdin/stdout
+    if path == "-":
+        return open((sys.stdin if mode == "r" else sys.stdout).fileno(), mode, encoding="utf-8", closefd=False)
+    return COMPRESSIONS.get(os.path.splitext(path)[1], open)(path, mode + "t", encoding="utf-8")
+
+
+def _strip_compression(path):
+    base, ext = os.path.splitext(path)
+    return base if ext in COMPRESSIONS else path
+
+
+def _is_jsonl(path):
+    return _strip_compression(path).endswith(".jsonl")
+
+
+class Progress:
+    # counts the converted items, and reports the count and throughput to stderr (at most once a second)
+    def __init__(self, enabled, unit):
+        self.enabled = enabled
+        self.unit = unit
+        self.count = 0
+        self.start = self.last_report = time.monotonic()
+
+    def update(self, count=1):
+        self.count += count
+        if self.enabled and (time.monotonic() - self.last_report >= 1):
+            self.report()
+
+    def report(self, end="\r"):
+        self.last_report = time.monotonic()
+        elapsed = self.last_report - self.start
+        print(f"{self.count} {self.unit} converted, {self.count / elapsed if elapsed else 0:.1f} {self.unit}/s", end=end, file=sys.stderr)
+
+    def close(self):
+        if self.enabled:
+            self.report(end="\n")
+
+
+def _convert_conllu(f_in, f_out, config, args, progress):
+    for i, sent in enumerate(iter_convert_bart_conllu(f_in, config["enhance_ud"], config["enhanced_plus_plus"], config["enhanced_extra"], args.preserve_comments,
+                                                      config["conv_iterations"], config["remove_eud_info"], config["remove_extra_info"],
+                                                      config["remove_node_adding_conversions"], config["remove_unc"], config["query_mode"],
+                                                      config["funcs_to_cancel"], config["ud_version"], args.workers, args.chunk_size)):
+        f_out.write(("\n" if i else "") + sent)
+        progress.update()
+
+
+def _convert_odin(f_in, f_out, config, args, progress):
+    # either a JSON Lines of Odin documents, or a JSON of an Odin document or of a documents mapping
+    if args.jsonl:
+        for doc in iter_convert_bart_odin((json.loads(line) for line in f_in if line.strip()), **config, workers=args.workers):
+            f_out.write(json.dumps(doc) + "\n")
+            progress.update()
+    else:
+        odin_json = json.load(f_in)
+        json.dump(convert_bart_odin(odin_json, **config, workers=args.workers), f_out)
+        progress.update(len(odin_json["documents"]) if "documents" in odin_json else 1)
+
+
+def _convert_spike(f_in, f_out, config, args, progress):
+    # either a JSON Lines of SPIKE sentences/documents, or a JSON of one (or a list) of them
+    spike_json = None if args.jsonl else json.load(f_in)
+    spike_items = (json.loads(line) for line in f_in if line.strip()) if args.jsonl else spike_json if isinstance(spike_json, list) else [spike_json]
+    converted = []
+    for spike_item in iter_convert_spike_sentences(spike_items, **config, graph_to_replace=args.graph_to_replace, workers=args.workers, chunk_size=args.chunk_size):
+        if args.jsonl:
+            f_out.write(json.dumps(spike_item) + "\n")
+        else:
+            converted.append(spike_item)
+        progress.update()
+    if not args.jsonl:
+        json.dump(converted if isinstance(spike_json, list) else converted[0], f_out)
+
+
+def _convert_tacred(f_in, f_out, config, args, progress):
+    # either a JSON list (as TACRED is released), or a JSON Lines, of TACRED instances.
+    #   the converted graphs are written in the CoNLL-U format, with the id of each instance as a comment
+    tacred_json = [json.loads(line) for line in f_in if line.strip()] if args.jsonl else json.load(f_in)
+    converted = convert_bart_tacred(tacred_json, **config, workers=args.workers)
+    all_comments = [["# id = " + str(instance["id"])] if "id" in instance else [] for instance in tacred_json]
+    f_out.write(serialize_conllu(converted, all_comments, config["remove_eud_info"], config["remove_extra_info"], True))
+    progress.update(len(converted))
+
+
+CONVERTERS = {"conllu": (_convert_conllu, "sentences"), "odin": (_convert_odin, "documents"), "spike": (_convert_spike, "items"), "tacred": (_convert_tacred, "sentences")}
+
+
+def _get_files(inputs, output, input_format):
+    # pairs each input file with its output file. an input directory is searched (recursively) for files of the input format,
+    #   and is mirrored to the output directory
+    if len(inputs) == 1 and not os.path.isdir(inputs[0]):
+        return [(inputs[0], output)]
+    if output == "-":
+        raise ValueError("an output directory is required for multiple inputs or an input directory")
+    files = []
+    for input_ in inputs:
+        if not os.path.isdir(input_):
+            files.append((input_, os.path.join(output, os.path.basename(input_))))
+            continue
+        for dir_path, _, file_names in os.walk(input_):
+            for file_name in sorted(file_names):
+                if _strip_compression(file_name).endswith(FORMAT_EXTENSIONS[input_format]):
+                    path = os.path.join(dir_path, file_name)
+                    files.append((path, os.path.join(output, os.path.relpath(path, input_))))
+    return files
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="pybart", description="Convert UD trees to BART graphs. Files ending with .gz/.bz2/.xz are (de)compressed transparently.")
+    parser.add_argument("inputs", nargs="+", help="input files or directories ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file, or directory for multiple inputs or an input directory ('-' for stdout)")
+    parser.add_argument("-f", "--format", choices=sorted(CONVERTERS), default="conllu", help="the input format (default: conllu)")
+    parser.add_argument("--jsonl", action="store_true", help="the JSON input is a JSON Lines (implied by a .jsonl extension)")
+
+    conversion = parser.add_argument_group("conversion")
+    conversion.add_argument("--no-enhance-ud", dest="enhance_ud", action="store_false", help="exclude Stanford's EnhancedUD conversions")
+    conversion.add_argument("--no-enhanced-plus-plus", dest="enhanced_plus_plus", action="store_false", help="exclude Stanford's EnhancedUD++ conversions")
+    conversion.add_argument("--no-enhanced-extra", dest="enhanced_extra", action="store_false", help="exclude BART's unique conversions")
+    conversion.add_argument("--conv-iterations", type=float, default=math.inf, help="the maximal number of iterations over the conversions (default: till convergence)")
+    conversion.add_argument("--remove-eud-info", action="store_true", help="exclude Stanford's EnhancedUD&EnhancedUD++'s extra label information")
+    conversion.add_argument("--remove-extra-info", action="store_true", help="exclude BART's extra label information")
+    conversion.add_argument("--remove-node-adding-conversions", action="store_true", help="exclude conversions that might add nodes")
+    conversion.add_argument("--remove-unc", action="store_true", help="exclude conversions that might contain uncertainty")
+    conversion.add_argument("--query-mode", action="store_true", help="exclude conversions that add arcs rather than reorder arcs")
+    conversion.add_argument("--funcs-to-cancel", nargs="+", metavar="CONVERSION", help="conversions to exclude by their names")
+    conversion.add_argument("--ud-version", type=int, choices=[1, 2], default=1, help="the UD version of the input (default: 1)")
+    conversion.add_argument("--preserve-comments", action="store_true", help="keep the comments of the CoNLL-U sentences")
+    conversion.add_argument("--graph-to-replace", default="universal-enhanced", help="the SPIKE graph to write the conversion to (default: universal-enhanced)")
+
+    execution = parser.add_argument_group("execution")
+    execution.add_argument("-w", "--workers", type=int, default=1, help="the number of processes to convert with, 0 for one per core (default: 1)")
+    execution.add_argument("--chunk-size", type=int, default=256, help="the number of CoNLL-U sentences or SPIKE items per conversion chunk (default: 256)")
+    execution.add_argument("--progress", action="store_true", help="report the progress and throughput to stderr")
+    return parser
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    args.workers = args.workers or os.cpu_count()
+    config = {name: getattr(args, name) for name in ["enhance_ud", "enhanced_plus_plus", "enhanced_extra", "conv_iterations", "remove_eud_info", "remove_extra_info",
+                                                     "remove_node_adding_conversions", "remove_unc", "query_mode", "funcs_to_cancel", "ud_version"]}
+    convert, unit = CONVERTERS[args.format]
+    try:
+        files = _get_files(args.inputs, args.output, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    progress = Progress(args.progress, unit)
+    jsonl = args.jsonl
+    for input_path, output_path in files:
+        args.jsonl = jsonl or _is_jsonl(input_path)
+        if output_path != "-" and os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with _open(input_path, "r") as f_in, _open(output_path, "w") as f_out:
+            convert(f_in, f_out, config, args, progress)
+    progress.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
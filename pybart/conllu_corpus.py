@@ -0,0 +1,141 @@
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+
+from .conllu_wrapper import parse_conllu
+
+# sentences are separated by (one or more) blank lines
+SENTENCE_SEPARATOR = re.compile(rb"\n(?:[ \t\r]*\n)+")
+
+# the index file header: magic, version, the indexed file's size and modification time, and the number of sentences
+INDEX_MAGIC = b"PBCI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sIQQQ")
+
+
+class ConlluCorpus:
+    """Purpose: random access to the sentences of a (possibly huge) CoNLL-U file.
+
+    The file is memory-mapped once, and indexed by the byte offsets of its sentences, which are parsed only on access.
+    The index can be persisted, so it is built only once per file. The corpus is pickled by its paths,
+    so workers reopen (and map) the file themselves, and can each take a disjoint range of it (see get_shards).
+
+    Args:
+        (str) The path of the CoNLL-U file.
+        (str) An optional path of the index file. A valid index is loaded from it,
+            otherwise the index is built and saved to it.
+    """
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._file_info = (stat.st_size, stat.st_mtime_ns)
+        # an empty file can't be mapped
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        # the start offsets of the sentences and their end offsets (after their last newline), interleaved
+        self.offsets = self._load_index(index_path) if index_path and os.path.exists(index_path) else None
+        if self.offsets is None:
+            self.offsets = self._build_index()
+            if index_path:
+                self.save_index(index_path)
+
+    def _build_index(self):
+        offsets = array("Q")
+        start = 0
+        for separator in SENTENCE_SEPARATOR.finditer(self._mm):
+            if self._mm[start: separator.start()].strip():
+                offsets.extend((start, separator.start() + 1))
+            start = separator.end()
+        if self._mm[start:].strip():
+            offsets.extend((start, len(self._mm)))
+        return offsets
+
+    def _load_index(self, index_path):
+        # returns None for an index of another version, or of another (or a modified) file
+        with open(index_path, "rb") as f:
+            magic, version, size, mtime_ns, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if (magic, version, (size, mtime_ns)) != (INDEX_MAGIC, INDEX_VERSION, self._file_info):
+                return None
+            offsets = array("Q")
+            offsets.frombytes(f.read(count * 2 * offsets.itemsize))
+        return offsets
+
+    def save_index(self, index_path):
+        with open(index_path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *self._file_info, len(self)))
+            f.write(self.offsets.tobytes())
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def _check_range(self, start, stop):
+        stop = len(self) if stop is None else stop
+        if not 0 <= start <= stop <= len(self):
+            raise IndexError(f"sentences range [{start}, {stop}) out of range")
+        return start, stop
+
+    def get_byte_range(self, start=0, stop=None):
+        """Purpose: returns the byte range of the given sentences range in the file."""
+        start, stop = self._check_range(start, stop)
+        if start == stop:
+            return 0, 0
+        return self.offsets[2 * start], self.offsets[2 * stop - 1]
+
+    def get_text(self, i):
+        """Purpose: returns the text of the i'th sentence (its comment and token lines)."""
+        if not 0 <= i < len(self):
+            raise IndexError(f"sentence {i} out of range")
+        return self._mm[self.offsets[2 * i]: self.offsets[2 * i + 1]].decode("utf-8")
+
+    def __getitem__(self, i):
+        """Purpose: parses the i'th sentence.
+
+        returns:
+            (list(Token)) The sentence, as returned by parse_conllu.
+            (list(str)) Its comments.
+        """
+        sentences, all_comments = parse_conllu(self.get_text(i))
+        return sentences[0], all_comments[0]
+
+    def iter_texts(self, start=0, stop=None):
+        start, stop = self._check_range(start, stop)
+        for i in range(start, stop):
+            yield self.get_text(i)
+
+    def iter_lines(self, start=0, stop=None):
+        """Purpose: yields the CoNLL-U formatted lines of the given sentences range (separated by blank lines),
+            e.g. to stream them to api.iter_convert_bart_conllu.
+        """
+        for text in self.iter_texts(start, stop):
+            yield from text.splitlines(True)
+            yield "\n"
+
+    def get_shards(self, num_shards):
+        """Purpose: splits the corpus into disjoint consecutive sentence ranges of about the same size in bytes.
+
+        returns:
+            (list((int, int))) The (start, stop) sentence range of each shard.
+        """
+        total = self.offsets[-1] if len(self) else 0
+        starts = self.offsets[::2]
+        # each shard starts at the first sentence starting after its share of the bytes
+        bounds = [0] + [bisect_right(starts, total * k // num_shards) for k in range(1, num_shards)] + [len(self)]
+        return list(zip(bounds, bounds[1:]))
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return self.__class__, (self.path, self.index_path)
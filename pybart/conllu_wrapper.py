@@ -69,6 +69,27 @@ def parse_conllu(text):
     return sentences, all_comments
 
 
+def iter_conllu_sentences(lines):
+    """Purpose: lazily splits CoNLL-U formatted lines into sentences.
+    
+    Args:
+        (iterable(str)) The lines, e.g. an open file.
+    
+    returns:
+        (generator(str)) yields the text of each sentence (its comment and token lines).
+     """
+    sentence = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            sentence.append(line)
+        elif sentence:
+            yield "\n".join(sentence)
+            sentence = []
+    if sentence:
+        yield "\n".join(sentence)
+
+
 def serialize_conllu(converted, all_comments, remove_enhanced_extra_info, remove_bart_extra_info, preserve_comments=False):
     """Purpose: create a CoNLL-U formatted text from a sentence list.
     
@@ -139,11 +160,11 @@ def parse_odin(odin_json):
         for i, (word, tag, lemma) in enumerate(zip(sent['words'], sent['tags'], sent['lemmas'])):
             sentence.append(Token(TokenId(i + 1), word, lemma, "_", tag, "_", None, "_", "_", "_"))
         for edge in sent['graphs']['universal-basic']['edges']:
-            sentence[edge['destination'] + 1].set_conllu_field('head', TokenId(edge['source'] + 1))
-            sentence[edge['destination'] + 1].set_conllu_field('deprel', edge['relation'])
+            sentence[edge['destination']].set_conllu_field('head', TokenId(edge['source'] + 1))
+            sentence[edge['destination']].set_conllu_field('deprel', edge['relation'])
         for root in sent['graphs']['universal-basic']['roots']:
-            sentence[root + 1].set_conllu_field('head', TokenId(0))
-            sentence[root + 1].set_conllu_field('deprel', "root")
+            sentence[root].set_conllu_field('head', TokenId(0))
+            sentence[root].set_conllu_field('deprel', "root")
         sentence.append(Token(TokenId(0), None, None, None, None, None, None, None, None, None))
 
         add_basic_edges(sentence)
@@ -174,12 +195,13 @@ def _fix_sentence_keep_order(conllu_sentence):
 def _fix_sentence_push_to_end(conllu_sentence):
     fixed = list()
 
-    for i, token in enumerate(conllu_sentence):
+    for token in conllu_sentence:
         iid = token.get_conllu_field("id")
         if iid.major == 0:
             continue
-        if iid.get_conllue_field("id").major != 0:
-            token.set_conllu_field("id", TokenId(i + 1))
+        # a copy node gets the id of its position (after the sentence's tokens, where it was appended)
+        if iid.minor != 0:
+            token.set_conllu_field("id", TokenId(len(fixed) + 1))
 
         fixed.append(token)
 
@@ -313,14 +335,15 @@ def conllu_to_odin(conllu_sentences, odin_to_enhance=None, is_basic=False, push_
 def parsed_tacred_json(data):
     sentences = []
     for d in data:
-        sentence = dict()
+        sentence = list()
         for i, (t, p, h, dep) in enumerate(
                 zip(d["token"], d["stanford_pos"], d["stanford_head"], d["stanford_deprel"])):
-            sentence[i + 1] = Token(i + 1, t, t, p, p, "_", int(h), dep, "_", "_")
-        sentence[0] = Token(0, None, None, None, None, None, None, None, None, None)
+            sentence.append(Token(TokenId(i + 1), t, t, p, p, "_", TokenId(int(h)), dep, "_", "_"))
+        root = Token(TokenId(0), None, None, None, None, None, None, None, None, None)
+        sentence.append(root)
         add_basic_edges(sentence)
-        [child.remove_edge(rel, sentence[0]) for child, rels in sentence[0].get_children_with_rels() for rel in rels]
-        _ = sentence.pop(0)
+        [child.remove_edge(rel, root) for child, rels in root.get_children_with_rels() for rel in rels]
+        _ = sentence.pop()
         sentences.append(sentence)
     
     return sentences
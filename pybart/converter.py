@@ -5,11 +5,13 @@
 #   3. we look for all fathers as we can have multiple fathers, while in SC they look at first one found.
 
 import sys
+import pickle
+import threading
 from collections import defaultdict
 import inspect
 
 from .constraints import *
-from .graph_token import Label, TokenId
+from .graph_token import Label, TokenId, get_sentence_index
 from .matcher import Matcher, NamedConstraint
 from dataclasses import dataclass
 
@@ -64,9 +66,21 @@ class Conversion:
     conv_type: ConvTypes
     constraint: Full
     transformation: ConvFuncSignature
+    # the conversions of phase 0 are iterated till convergence, and then each of the following (final) phases
+    #   is run once, by their order
+    phase: int = 0
 
     def __post_init__(self):
         self.name = self.transformation.__name__
+        # the (ud_version, remove_node_adding_conversions) key of the conversions registry this conversion belongs to
+        self.registry_key = None
+
+    # the transformations are closures (of init_conversions), so a registered conversion is pickled by reference,
+    #   and is taken back from the registry of the unpickling process (which initializes it at most one time).
+    def __reduce__(self):
+        if self.registry_key is None:
+            raise pickle.PicklingError(f"Conversion {self.name} is not in the conversions registry")
+        return get_registered_conversion, (*self.registry_key, self.name)
 
 
 def get_eud_info(eud_str, converter):
@@ -1571,15 +1585,24 @@ def init_conversions(remove_node_adding_conversions, ud_version):
         Conversion(ConvTypes.BART, extra_appos_propagation_constraint, extra_appos_propagation),
         Conversion(ConvTypes.BART, extra_subj_obj_nmod_propagation_of_nmods_constraint, extra_subj_obj_nmod_propagation_of_nmods),
         Conversion(ConvTypes.BART, extra_passive_alteration_constraint, extra_passive_alteration),
-        Conversion(ConvTypes.BART, extra_amod_propagation_constraint, extra_amod_propagation)
+        Conversion(ConvTypes.BART, extra_amod_propagation_constraint, extra_amod_propagation, phase=1)
     ]
     return {conversion.name: conversion for conversion in conversion_list}
 
 
+# compiles the constraints of the given conversions into a single matcher,
+#   this is a one timer per conversion set (the matcher is stateless with regard to the matched sentences).
+def init_matcher(conversions):
+    return Matcher([NamedConstraint(conversion_name, conversion.constraint)
+                    for conversion_name, conversion in conversions.items()])
+
+
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++ #
 
 
 def remove_funcs(conversions, enhanced, enhanced_plus_plus, enhanced_extra, remove_enhanced_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel):
+    # work on a copy, as the given conversions may be a shared (one time initialized) set
+    conversions = dict(conversions)
     if not enhanced:
         conversions = {conversion.name: conversion for conversion in conversions.values() if conversion.conv_type != ConvTypes.EUD}
     if not enhanced_plus_plus:
@@ -1607,6 +1630,45 @@ def remove_funcs(conversions, enhanced, enhanced_plus_plus, enhanced_extra, remo
     return conversions
 
 
+# registry of the one time initialized conversions (and their compiled matcher), per (ud_version, remove_node_adding_conversions),
+#   and of their filtered versions per filtering configuration. So that all the entry points share them within the process.
+#   They are filled under a lock, so that threads converting concurrently initialize each entry once. Once initialized,
+#   the conversions and the matcher are only read while converting (the per-call state is kept by each Convert).
+_initialized_conversions = dict()
+_filtered_conversions = dict()
+_registry_lock = threading.RLock()
+
+
+def get_initialized_conversions(remove_node_adding_conversions, ud_version):
+    key = (ud_version, remove_node_adding_conversions)
+    if key not in _initialized_conversions:
+        with _registry_lock:
+            if key not in _initialized_conversions:
+                conversions = init_conversions(remove_node_adding_conversions, ud_version)
+                for conversion in conversions.values():
+                    conversion.registry_key = key
+                _initialized_conversions[key] = (conversions, init_matcher(conversions))
+    return _initialized_conversions[key]
+
+
+def get_registered_conversion(ud_version, remove_node_adding_conversions, name):
+    conversions, _ = get_initialized_conversions(remove_node_adding_conversions, ud_version)
+    return conversions[name]
+
+
+def get_filtered_conversions(enhanced, enhanced_plus_plus, enhanced_extra, remove_enhanced_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel, ud_version):
+    key = (ud_version, enhanced, enhanced_plus_plus, enhanced_extra, remove_enhanced_extra_info,
+           remove_node_adding_conversions, remove_unc, query_mode, frozenset(funcs_to_cancel or []))
+    if key not in _filtered_conversions:
+        with _registry_lock:
+            if key not in _filtered_conversions:
+                conversions, _ = get_initialized_conversions(remove_node_adding_conversions, ud_version)
+                _filtered_conversions[key] = remove_funcs(conversions, enhanced, enhanced_plus_plus, enhanced_extra,
+                                                          remove_enhanced_extra_info, remove_node_adding_conversions,
+                                                          remove_unc, query_mode, funcs_to_cancel)
+    return _filtered_conversions[key]
+
+
 class Convert:
     def __init__(self, *args):
         self.args = args
@@ -1619,62 +1681,88 @@ class Convert:
     def __call__(self):
         return self.convert(*self.args)
 
-    def get_rel_set(self, converted_sentence):
-        return set([(str(head.get_conllu_field("id")),
-                     rel.to_str(self.remove_enhanced_extra_info, self.remove_bart_extra_info),
-                     str(tok.get_conllu_field("id"))) for tok in converted_sentence
-                    for (head, rels) in tok.get_new_relations() for rel in rels])
+    def get_edges_state(self, index):
+        # the euds of the labels used to be normalized by printing them on each convergence check,
+        #   and the following conversions rely on that
+        if not self.remove_enhanced_extra_info:
+            index.normalize_euds()
+        return index.edges_state()
 
     def convert(self, parsed, enhanced, enhanced_plus_plus, enhanced_extra, conv_iterations, remove_enhanced_extra_info,
                 remove_bart_extra_info, remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel,
-                ud_version=1, one_time_initialized_conversions=None):
+                ud_version=1, one_time_initialized_conversions=None, one_time_initialized_matcher=None):
 
         if one_time_initialized_conversions:
             conversions = one_time_initialized_conversions
+            # the matcher is compiled over the unfiltered conversions, so it can be shared by any filtering of them
+            if one_time_initialized_matcher:
+                matcher = one_time_initialized_matcher
+            else:
+                matcher = init_matcher(conversions)
+            conversions = remove_funcs(conversions, enhanced, enhanced_plus_plus, enhanced_extra,
+                                       remove_enhanced_extra_info,
+                                       remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel)
         else:
-            conversions = init_conversions(remove_node_adding_conversions, ud_version)
-        conversions = remove_funcs(conversions, enhanced, enhanced_plus_plus, enhanced_extra,
-                                   remove_enhanced_extra_info,
-                                   remove_node_adding_conversions, remove_unc, query_mode, funcs_to_cancel)
+            _, matcher = get_initialized_conversions(remove_node_adding_conversions, ud_version)
+            conversions = get_filtered_conversions(enhanced, enhanced_plus_plus, enhanced_extra,
+                                                   remove_enhanced_extra_info, remove_node_adding_conversions,
+                                                   remove_unc, query_mode, funcs_to_cancel, ud_version)
 
         i = 0
         updated = []
         for sentence in parsed:
             sentence_as_list = [t for t in sentence if t.get_conllu_field("id").major != 0]
             assign_ccs_to_conjs(sentence_as_list, self.cc_assignments)
-            i = max(i, self.convert_sentence(sentence_as_list, conversions, conv_iterations))
+            i = max(i, self.convert_sentence(sentence_as_list, conversions, conv_iterations, matcher))
             updated.append(sentence_as_list)
 
         return updated, i
 
-    def convert_sentence(self, sentence: Sequence[Token], conversions, conv_iterations: int):
+    def convert_sentence(self, sentence: Sequence[Token], conversions, conv_iterations: int, matcher: Matcher):
         last_converted_sentence = None
         i = 0
-        on_last_iter = ["extra_amod_propagation"]
-        do_last_iter = []
-        # we iterate till convergence or till user defined maximum is reached - the first to come.
-        matcher = Matcher([NamedConstraint(conversion_name, conversion.constraint)
-                           for conversion_name, conversion in conversions.items()])
+        phases = defaultdict(list)
+        for conv_name, conversion in conversions.items():
+            phases[conversion.phase].append(conv_name)
+        final_phases = [phases[phase] for phase in sorted(phases) if phase != 0]
+        # the per-sentence matching state lives as long as the sentence is being converted
+        m = matcher(sentence)
+        # the sentence index keeps a summary of the edges up to date, so convergence is checked without going over them
+        index = get_sentence_index(sentence)
+        # per conversion, the sentence changes count before its last run, and whether that run changed the sentence
+        last_run_at = dict()
+        changed_on_last_run = set()
+
+        def run_conversion(conv_name):
+            last_run_at[conv_name] = index.changes
+            matches = m.matches_for(conv_name)
+            conversions[conv_name].transformation(sentence, matches, self)
+            if index.changed_since(last_run_at[conv_name]):
+                changed_on_last_run.add(conv_name)
+            else:
+                changed_on_last_run.discard(conv_name)
+
         no_change_on_last_iter = False
+        # we iterate till convergence or till user defined maximum is reached - the first to come.
         while i < conv_iterations:
-            last_converted_sentence = self.get_rel_set(sentence)
-            m = matcher(sentence)
-            for conv_name in m.names():
-                if conv_name in on_last_iter:
-                    do_last_iter.append(conv_name)
+            last_converted_sentence = self.get_edges_state(index)
+            for conv_name in phases[0]:
+                # a conversion that didn't change the sentence on its last run, would have no effect now as well,
+                #   unless the labels it matches on have changed since (so it is queued again only by such changes)
+                if conv_name in last_run_at and conv_name not in changed_on_last_run and \
+                        not index.changed_since(last_run_at[conv_name], matcher.dependencies.get(conv_name)):
                     continue
-                matches = m.matches_for(conv_name)
-                conversions[conv_name].transformation(sentence, matches, self)
-            if self.get_rel_set(sentence) == last_converted_sentence:
+                run_conversion(conv_name)
+            if self.get_edges_state(index) == last_converted_sentence:
                 no_change_on_last_iter = True
                 break
             i += 1
 
-        for conv_name in do_last_iter:
-            m = matcher(sentence)
-            matches = m.matches_for(conv_name)
-            conversions[conv_name].transformation(sentence, matches, self)
-        if (self.get_rel_set(sentence) != last_converted_sentence) and no_change_on_last_iter:
+        if conv_iterations > 0:
+            for final_phase in final_phases:
+                for conv_name in final_phase:
+                    run_conversion(conv_name)
+        if (self.get_edges_state(index) != last_converted_sentence) and no_change_on_last_iter:
             i += 1
 
         return i
@@ -1,4 +1,5 @@
-from dataclasses import dataclass, field
+from collections import defaultdict, Counter
+from dataclasses import dataclass, field, replace
 from .constants.constants import EUD_LITERAL_ALLOWED_LIST
 
 
@@ -60,6 +61,8 @@ class Token:
                              "feats": feats, "head": head, "deprel": deprel, "deps": deps, "misc": misc}
         self._children_list = []
         self._new_deps = dict()
+        # the index of the sentence this token is part of (if any), which is notified on each edge change
+        self._index = None
 
     def copy(self, new_id=None, form=None, lemma=None, upos=None, xpos=None, feats=None, head=None, deprel=None, deps=None, misc=None):
         new_id_copy, form_copy, lemma_copy, upos_copy, xpos_copy, feats_copy, head_copy, deprel_copy, deps_copy, misc_copy = self._conllu_info.values()
@@ -120,6 +123,8 @@ class Token:
         else:
             self._new_deps[head] = [rel]
             head.add_child(self)
+        if self._index is not None:
+            self._index.edge_added(self, rel, head)
 
     def remove_edge(self, rel, head):
         assert isinstance(rel, Label)
@@ -128,6 +133,8 @@ class Token:
             if not self._new_deps[head]:
                 self._new_deps.pop(head)
                 head.remove_child(self)
+            if self._index is not None:
+                self._index.edge_removed(self, rel, head)
 
     def remove_all_edges(self):
         _ = [self.remove_edge(edge, head) for head, edges in list(self.get_new_relations()) for edge in edges]
@@ -141,6 +148,164 @@ class Token:
         return self.get_conllu_field('id') < other.get_conllu_field('id')
 
 
+class SentenceIndex:
+    """Purpose: label and field lookups over a sentence (a list of tokens), for the matching process.
+
+    The index attaches itself to the tokens of the sentence, which update it in place on each added/removed edge,
+    so it stays correct throughout the conversion. Tokens that are appended to the sentence (i.e. copy nodes)
+    are indexed lazily, on the next lookup.
+    """
+    indexed_fields = ("form", "lemma", "xpos")
+
+    def __init__(self, sentence):
+        self.sentence = sentence
+        # token to its position in the sentence
+        self.positions = dict()
+        # base label to the (child, head) token pairs it connects (with the number of such labels per pair)
+        self.edges_by_label = defaultdict(Counter)
+        # per token base label counts of its incoming and outgoing edges
+        self.incoming = defaultdict(Counter)
+        self.outgoing = defaultdict(Counter)
+        # per field, a lowercased field value to the positions of the tokens having it
+        self.fields = {field_name: defaultdict(list) for field_name in self.indexed_fields}
+        # a count of the changes to the sentence, the count at the last change of each base label,
+        #   and the count at the last time tokens were added
+        self.changes = 0
+        self.label_changes = dict()
+        self.tokens_changes = 0
+        # the distinct edges of the sentence (with their number of copies), and an order independent hash of them,
+        #   so whether the edges have changed is told by comparing hashes rather than the edges themselves
+        self.edges = Counter()
+        self.edges_hash = 0
+        # the edges whose label has an eud that is altered once printed (see Label.to_str)
+        self.unprinted_euds = []
+        self._sync()
+
+    def _sync(self):
+        if len(self.positions) < len(self.sentence):
+            self.changes += 1
+            self.tokens_changes = self.changes
+        for position in range(len(self.positions), len(self.sentence)):
+            token = self.sentence[position]
+            self.positions[token] = position
+            for field_name, by_value in self.fields.items():
+                value = token.get_conllu_field(field_name)
+                by_value[value.lower() if value is not None else value].append(position)
+            # edges that were added to this token before it was attached are counted now,
+            #   edges that were added to it as a head are counted already by their (attached) children.
+            if token._index is not self:
+                token._index = self
+                for head, rels in token.get_new_relations():
+                    for rel in rels:
+                        self.edge_added(token, rel, head)
+
+    @staticmethod
+    def _edge_key(child, rel, head):
+        # the eud is keyed as printed (see Label.to_str) so the key doesn't change when the label is printed
+        eud = rel.eud
+        if eud is not None:
+            eud = eud.lower() if eud.lower() in EUD_LITERAL_ALLOWED_LIST else "_other"
+        return child, head, rel.base, eud, rel.src, rel.src_type, rel.phrase, rel.uncertain, rel.iid
+
+    def edge_added(self, child, rel, head):
+        self.changes += 1
+        self.label_changes[rel.base] = self.changes
+        key = self._edge_key(child, rel, head)
+        if key[3] == "_other" and rel.eud != "_other":
+            self.unprinted_euds.append((child, rel, head))
+        if key not in self.edges:
+            self.edges_hash ^= hash(key)
+        self.edges[key] += 1
+        self.edges_by_label[rel.base][(child, head)] += 1
+        self.incoming[child][rel.base] += 1
+        self.outgoing[head][rel.base] += 1
+
+    def edge_removed(self, child, rel, head):
+        self.changes += 1
+        self.label_changes[rel.base] = self.changes
+        key = self._edge_key(child, rel, head)
+        if key in self.edges:
+            self.edges[key] -= 1
+            if self.edges[key] <= 0:
+                del self.edges[key]
+                self.edges_hash ^= hash(key)
+        for counter, key in [(self.edges_by_label[rel.base], (child, head)),
+                             (self.incoming[child], rel.base), (self.outgoing[head], rel.base)]:
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+
+    def incoming_labels(self, position):
+        self._sync()
+        return self.incoming[self.sentence[position]].keys()
+
+    def outgoing_labels(self, position):
+        self._sync()
+        return self.outgoing[self.sentence[position]].keys()
+
+    def positions_by_field(self, field_name, values, in_values=True):
+        # positions of the tokens whose (lowercased) field is one of the given values (or isn't, if not in_values)
+        self._sync()
+        by_value = self.fields[field_name]
+        found = set()
+        for value in values:
+            found.update(by_value.get(value, []))
+        return found if in_values else set(range(len(self.sentence))).difference(found)
+
+    def changed_since(self, changes, labels=None):
+        # whether the sentence changed after the given changes count (if labels are given, only tokens
+        #   addition and changes of edges with these base labels are considered)
+        self._sync()
+        if labels is None:
+            return self.changes > changes
+        return self.tokens_changes > changes or any(self.label_changes.get(label, 0) > changes for label in labels)
+
+    def normalize_euds(self):
+        # alters the euds of the labels in the sentence as printing them would (see Label.to_str)
+        for child, rel, head in self.unprinted_euds:
+            if any(cur_rel is rel for cur_rel in child._new_deps.get(head, [])):
+                rel.eud = "_other"
+        self.unprinted_euds = []
+
+    def edges_state(self):
+        # a cheap summary of the edges of the sentence, that is equal for equal sets of edges
+        self._sync()
+        return len(self.edges), self.edges_hash
+
+    def has_any_label(self, labels):
+        # whether some edge in the sentence has one of the given base labels
+        self._sync()
+        return any(self.edges_by_label.get(label) for label in labels)
+
+    def has_any_field_value(self, field_name, values):
+        # whether some token in the sentence has one of the given (lowercased) field values
+        self._sync()
+        by_value = self.fields[field_name]
+        return any(value in by_value for value in values)
+
+    def parent_positions(self, position):
+        # positions of the parents of the token in the given position (parents out of the sentence are skipped)
+        self._sync()
+        return [self.positions[head] for head in self.sentence[position].get_parents() if head in self.positions]
+
+    def edge_positions(self, label):
+        # (child, head) position pairs of the edges having the given base label
+        self._sync()
+        return [(self.positions[child], self.positions[head]) for child, head in self.edges_by_label.get(label, [])
+                if child in self.positions and head in self.positions]
+
+
+def get_sentence_index(sentence):
+    """Purpose: returns the index that is attached to the sentence, or index it if there isn't one.
+
+    Args:
+        (list(Token)) The sentence.
+    """
+    if sentence and sentence[0]._index is not None and sentence[0]._index.sentence is sentence:
+        return sentence[0]._index
+    return SentenceIndex(sentence)
+
+
 def add_basic_edges(sentence):
     """Purpose: adds each basic deprel relation and the relevant father to its son.
 
@@ -152,3 +317,48 @@ def add_basic_edges(sentence):
         head = token.get_conllu_field('head')
         if head is not None:
             sentence[cur_id].add_edge(Label(token.get_conllu_field('deprel')), sentence[head.major - 1])
+
+
+def sentence_to_state(sentence):
+    """Purpose: returns a flat state of the sentence (its tokens info and edges, where heads are given by position),
+        which can be pickled (e.g. to pass the sentence between processes) without recursing through the graph.
+
+    Args:
+        (list(Token)) The sentence.
+
+    returns:
+        (int, list) The sentence length and the tokens states, where heads out of the sentence (e.g. the root)
+            are appended after its tokens.
+    """
+    positions = {token: i for i, token in enumerate(sentence)}
+    tokens = list(sentence)
+    i = 0
+    while i < len(tokens):
+        for head in tokens[i].get_parents():
+            if head not in positions:
+                positions[head] = len(tokens)
+                tokens.append(head)
+        i += 1
+    return len(sentence), [(token._conllu_info, [(positions[head], rels) for head, rels in token.get_new_relations()])
+                           for token in tokens]
+
+
+def sentence_from_state(state, iids_offset=0):
+    """Purpose: rebuilds a sentence from its state (see sentence_to_state).
+
+    Args:
+        (int, list) The state.
+        (int) An offset to add to the iids of the labels, as iids are numbered per conversion run
+            (e.g. when rebuilding sentences that were converted separately).
+
+    returns:
+        (list(Token)) The sentence.
+    """
+    length, tokens_state = state
+    tokens = [Token(*info.values()) for info, _ in tokens_state]
+    for token, (_, edges) in zip(tokens, tokens_state):
+        for head_position, rels in edges:
+            head = tokens[head_position]
+            token._new_deps[head] = [replace(rel, iid=rel.iid + iids_offset) if rel.iid is not None else rel for rel in rels]
+            head.add_child(token)
+    return tokens[:length]
@@ -15,9 +15,10 @@
 
 from dataclasses import replace
 from collections import defaultdict
-from typing import NamedTuple, Sequence, Mapping, Any, List, Tuple, Generator, Dict, Optional
+from itertools import product
+from typing import NamedTuple, Sequence, Mapping, Any, List, Tuple, Generator, Dict, Optional, Collection
 from .constraints import *
-from .graph_token import Token as BartToken
+from .graph_token import Token as BartToken, get_sentence_index
 
 
 # ********************************************* BartSentence functionality *********************************************
@@ -26,10 +27,6 @@ from .graph_token import Token as BartToken
 field_by_field = {FieldNames.WORD: "form", FieldNames.TAG: "xpos", FieldNames.LEMMA: "lemma"}
 
 
-def get_content_by_field(tok: BartToken, cur_field: FieldNames) -> str:
-    return tok.get_conllu_field(field_by_field[cur_field])
-
-
 # gets the verbatim of a token in position i in the sentence
 def get_text(sentence: Sequence[BartToken], i: int) -> str:
     return sentence[i].get_conllu_field("form")
@@ -39,19 +36,54 @@ def get_children_count(sentence: Sequence[BartToken], parent: int) -> int:
     return len(sentence[parent].get_children())
 
 
-# returns a string list of labels connecting child to parent (or incoming/outgoing to/from child/parent respectively
-def get_labels(sentence: Sequence[BartToken], child: int = None, parent: int = None) -> List[str]:
+# returns the labels of the edges connecting child to parent
+def get_edge_labels(sentence: Sequence[BartToken], child: int, parent: int) -> List[str]:
+    return [rel.base for _, rels in sentence[child].get_new_relations(given_head=sentence[parent]) for rel in rels]
+
+
+# returns the labels connecting child to parent (or incoming/outgoing to/from child/parent respectively).
+#   the single token lookups are answered by the sentence index, and thus should not be altered by the caller.
+def get_labels(sentence: Sequence[BartToken], child: int = None, parent: int = None) -> Collection[str]:
     labels = []
     if child is not None:
         if parent is not None:
-            parent = sentence[parent]
-        labels = [rel.base for _, rels in sentence[child].get_new_relations(given_head=parent) for rel in rels]
+            labels = get_edge_labels(sentence, child, parent)
+        else:
+            labels = get_sentence_index(sentence).incoming_labels(child)
     elif parent is not None:
-        labels = [rel.base for _, rels in sentence[parent].get_children_with_rels() for rel in rels]
+        labels = get_sentence_index(sentence).outgoing_labels(parent)
 
     return labels
 
 
+# returns the positions of the tokens that satisfy all the given field constraints
+def get_tokens_by_fields(sentence: Sequence[BartToken], field_cons: Sequence[Field]) -> List[int]:
+    index = get_sentence_index(sentence)
+    satisfied = None
+    for field_con in field_cons:
+        cur_satisfied = index.positions_by_field(field_by_field[field_con.field], field_con.value, field_con.in_sequence)
+        satisfied = cur_satisfied if satisfied is None else satisfied.intersection(cur_satisfied)
+        if not satisfied:
+            break
+    return sorted(satisfied)
+
+
+# returns the (child, parent) position pairs of the actual edges that could satisfy an edge constraint,
+#   sorted by the child and then the parent position.
+#   When a label that must be present is known, the pairs are taken from that label's edges,
+#   otherwise from the incoming edges of each of the child candidates.
+def get_edge_candidates(sentence: Sequence[BartToken], children: Sequence[int], parents: Set[int],
+                        required_labels: Optional[Sequence[str]]) -> List[Tuple[int, int]]:
+    index = get_sentence_index(sentence)
+    if required_labels is not None:
+        children = set(children)
+        pairs = {pair for label in required_labels for pair in index.edge_positions(label)
+                 if pair[0] in children and pair[1] in parents}
+    else:
+        pairs = {(child, parent) for child in children for parent in index.parent_positions(child) if parent in parents}
+    return sorted((child, parent) for child, parent in pairs if child != parent)
+
+
 # function that checks that a sequence of Label constraints is satisfied
 def get_matched_labels(label_constraints: Sequence[LabelPresence], actual_labels: List[str]) -> Optional[Set[str]]:
     successfully_matched = set()
@@ -85,14 +117,30 @@ class MatchingResult:
 class GlobalMatcher:
     def __init__(self, constraint: Full):
         self.constraint = constraint
-        self.captured_labels = defaultdict(set)
         # list of token ids that don't require a capture
         self.dont_capture_names = [token.id for token in constraint.tokens if not token.capture]
+        # per edge, a list of labels of which (at least) one must be present in a satisfying edge, if there is such.
+        #   this allows looking up the candidate edges by their label.
+        self.edges_required_labels = [
+            next((list(label.value) for label in edge.label if isinstance(label, HasLabelFromList) and not label.is_regex), None)
+            for edge in constraint.edges]
+        # the distance and concat constraints by their token names, so they are checked as soon as their tokens are matched
+        self.distances_by_name = defaultdict(list)
+        for distance in constraint.distances:
+            for name in {distance.token1, distance.token2}:
+                self.distances_by_name[name].append(distance)
+        self.concats_by_name = defaultdict(list)
+        for concat in constraint.concats:
+            for name in set(concat.get_token_names()):
+                self.concats_by_name[name].append(concat)
 
     # filter a single match group according to distance constraints
-    def _filter_distance_constraints(self, match: Mapping[str, int]) -> bool:
+    def _filter_distance_constraints(self, match: Mapping[str, int], names: Optional[Sequence[str]] = None) -> bool:
         # check that the distance between the tokens is not more than or exactly as required
-        for distance in self.constraint.distances:
+        #   (if names are given, only the distances involving them are checked, as the rest were checked already)
+        distances = self.constraint.distances if names is None else \
+            [distance for name in names for distance in self.distances_by_name.get(name, [])]
+        for distance in distances:
             # Note - we assume that if a token is not in the match dict, then it was an optional one,
             #   and thus we can skip on this distance constraint
             if distance.token1 not in match or distance.token2 not in match:
@@ -103,9 +151,13 @@ class GlobalMatcher:
         return True
 
     # filter a single match group according to concat constraints
-    def _filter_concat_constraints(self, match: Mapping[str, int], sentence: Sequence[BartToken]) -> bool:
+    def _filter_concat_constraints(self, match: Mapping[str, int], sentence: Sequence[BartToken],
+                                   names: Optional[Sequence[str]] = None) -> bool:
         # check for a two-word or three-word phrase match in a given phrases list
-        for concat in self.constraint.concats:
+        #   (if names are given, only the concats involving them are checked, as the rest were checked already)
+        concats = self.constraint.concats if names is None else \
+            [concat for name in names for concat in self.concats_by_name.get(name, [])]
+        for concat in concats:
             token_names = concat.get_token_names()
             # Note - we assume that if a token is not in the match dict, then it was an optional one,
             #   and thus we can skip on this concat constraint
@@ -116,46 +168,35 @@ class GlobalMatcher:
                 return False
         return True
 
-    @staticmethod
-    def _try_merge(base_assignment: Mapping[str, int], new_assignment: Mapping[str, int]) -> Mapping[str, int]:
-        # try to merge two assignment if they do not contradict
-        for k, v in new_assignment.items():
-            if v != base_assignment.get(k, v):
-                return {}
-        merged_assignment = {**base_assignment, **new_assignment}
-        # a merge shouldnt consist of duplicate values, so remove it
-        if len(set(merged_assignment.values())) < len(merged_assignment.values()):
-            return {}
-        return merged_assignment
-
-    def _filter_edge_constraints(self, matches: Mapping[str, List[int]], sentence: Sequence[BartToken]) \
+    def _filter_edge_constraints(self, matches: Mapping[str, List[int]], sentence: Sequence[BartToken],
+                                 captured_labels: Optional[Dict[Tuple[str, int, str, int], Set[str]]] = None) \
             -> List[Tuple[bool, List[Dict[str, int]]]]:
+        if captured_labels is None:
+            captured_labels = defaultdict(set)
         edges_assignments = list()
         # pick possible assignments according to the edge constraint
-        for edge in self.constraint.edges:
+        for edge, required_labels in zip(self.constraint.edges, self.edges_required_labels):
             edge_assignments = []
-            # try each pair as a candidate
+            children = matches.get(edge.child, [])
+            parents = set(matches.get(edge.parent, []))
+            # try each of the actual edges between the candidates (rather than each child-parent pair),
+            #   so the cost depends on the number of edges and not on the square of the sentence length.
             # Note - we assume that if a token is not in the matches dict, then it was an optional one,
             #   and thus we can skip on this edge constraint
             # Note2 - we assume that if a node is not mentioned in any edge constraint,
             #   then it is a redundant token-constraint
-            for child in matches.get(edge.child, []):
-                for parent in matches.get(edge.parent, []):
-                    if child == parent:
-                        continue
-                    # check if edge constraint is satisfied
-                    captured_labels = None
-                    actual_labels = get_labels(sentence, child=child, parent=parent)
-                    if actual_labels:
-                        captured_labels = get_matched_labels(edge.label, actual_labels)
-                    if captured_labels is None:
-                        continue
-                    # TODO - compare the speed of non-edge filtering here to the current post-merging location:
-                    #   "if self._filter(assignment, sentence)"
-                    # store all captured labels according to the child-parent token pair
-                    self.captured_labels[(edge.child, child, edge.parent, parent)].update(captured_labels)
-                    # keep the filtered assignment for further merging
-                    edge_assignments.append({edge.child: child, edge.parent: parent})
+            for child, parent in (get_edge_candidates(sentence, children, parents, required_labels)
+                                  if children and parents else []):
+                # check if edge constraint is satisfied
+                matched_labels = get_matched_labels(edge.label, get_edge_labels(sentence, child, parent))
+                if matched_labels is None:
+                    continue
+                # TODO - compare the speed of non-edge filtering here to the current post-merging location:
+                #   "if self._filter(assignment, sentence)"
+                # store all captured labels according to the child-parent token pair
+                captured_labels[(edge.child, child, edge.parent, parent)].update(matched_labels)
+                # keep the filtered assignment for further merging
+                edge_assignments.append({edge.child: child, edge.parent: parent})
             if edge_assignments:
                 edges_assignments.append((edge.optional, edge_assignments))
             elif not edge.optional:
@@ -163,47 +204,128 @@ class GlobalMatcher:
         return edges_assignments
 
     @staticmethod
-    def _merge_edges_assignments(edges_assignments: List[Tuple[bool, List[Dict[str, int]]]]) -> List[Dict[str, int]]:
-        merges = []
-        # for each list of possible assignments of an edge
-        for edge_is_optional, edge_assignments in edges_assignments:
-            new_merges = []
-            # for each merged assignment. (we need an empty dictionary for the first cycle to start with)
-            for merged in (merges if merges else [{}]):
-                # for each possible assignment in the current list
-                edge_added = False
-                for assignment in edge_assignments:
-                    # try to merge (see that there is no contradiction on hashing)
-                    just_merged = GlobalMatcher._try_merge(merged, assignment)
-                    if just_merged:
-                        edge_added = True
-                        new_merges.append(just_merged)
-                # this is in case we couldnt merge any new assignment of an optional edge to an existing merge,
-                # we simply add the merge as is
-                if not edge_added and edge_is_optional:
-                    new_merges.append(merged)
-            if not new_merges:
-                return []
-            merges = new_merges
+    def _plan_merge_order(edges_assignments: List[Tuple[bool, List[Dict[str, int]]]]) -> List[int]:
+        # order the merging of the edges assignments, so that the intermediate merges stay small.
+        #   an optional edge keeps a merge that it couldn't extend, so its outcome depends on the edges merged before it,
+        #   thus optional edges stay in place, and only the required edges between them are reordered:
+        #   first the edge with the fewest assignments, and then (preferring edges that share a token with the
+        #   already merged ones, to avoid cross products) the next fewest, and so on.
+        order = []
+        bound_names = set()
+        segment = []
+        for i, (edge_is_optional, edge_assignments) in enumerate(edges_assignments + [(True, [])]):
+            if not edge_is_optional:
+                segment.append(i)
+                continue
+            while segment:
+                connected = [j for j in segment if bound_names.intersection(edges_assignments[j][1][0])]
+                best = min(connected or segment, key=lambda j: (len(edges_assignments[j][1]), j))
+                segment.remove(best)
+                order.append(best)
+                bound_names.update(edges_assignments[best][1][0])
+            if i < len(edges_assignments):
+                order.append(i)
+                bound_names.update(edge_assignments[0])
+        return order
 
-        return merges
+    @staticmethod
+    def _join_table(edge_names: Sequence[str], edge_assignments: List[Dict[str, int]]) \
+            -> Dict[Tuple[Tuple[bool, ...], Tuple[int, ...]], List[Tuple[int, Tuple[int, ...]]]]:
+        # hash the assignments of an edge by each subset of their token names (the ones that a merge already has),
+        #   so a merge is joined only with the assignments that agree with it on the names they share.
+        table = defaultdict(list)
+        for assignment_index, assignment in enumerate(edge_assignments):
+            values = tuple(assignment[name] for name in edge_names)
+            for bound_mask in product([False, True], repeat=len(edge_names)):
+                shared = tuple(value for value, is_bound in zip(values, bound_mask) if is_bound)
+                table[(bound_mask, shared)].append((assignment_index, values))
+        return table
+
+    @staticmethod
+    def _iter_merges(edges_assignments: List[Tuple[bool, List[Dict[str, int]]]],
+                     filter_bound: Optional[Callable[[Mapping[str, int], Sequence[str]], bool]] = None) \
+            -> Generator[Dict[str, int], None, None]:
+        # merge the edges assignments depth first, binding one edge at a time (in the planned order) and backtracking,
+        #   so no intermediate merges are kept, and a merge is dropped as soon as its newly bound names fail filter_bound.
+        if not edges_assignments:
+            return
+        order = GlobalMatcher._plan_merge_order(edges_assignments)
+        edges_names = [list(edge_assignments[0]) for _, edge_assignments in edges_assignments]
+        tables = [GlobalMatcher._join_table(edge_names, edge_assignments)
+                  for edge_names, (_, edge_assignments) in zip(edges_names, edges_assignments)]
+        # the current merge, the positions it uses, and the position of the assignment it took from each edge
+        #   (in the declared edges order), which is the order of the merges as if merged in the declared order.
+        bound = dict()
+        used_values = set()
+        key = [0] * len(edges_assignments)
+
+        def extend(step):
+            if step == len(order):
+                yield tuple(key), dict(bound)
+                return
+            edge_index = order[step]
+            edge_is_optional = edges_assignments[edge_index][0]
+            edge_names = edges_names[edge_index]
+            bound_mask = tuple(name in bound for name in edge_names)
+            shared = tuple(bound[name] for name in edge_names if name in bound)
+            new_names = [name for name in edge_names if name not in bound]
+            # for each possible assignment that agrees with the merge on the shared names
+            edge_added = False
+            for assignment_index, values in tables[edge_index].get((bound_mask, shared), []):
+                new_values = [value for value, is_bound in zip(values, bound_mask) if not is_bound]
+                # a merge shouldnt consist of duplicate values, so skip such an assignment
+                if used_values.intersection(new_values) or len(set(new_values)) < len(new_values):
+                    continue
+                # the optional edge could extend the merge (even if the extension is filtered right after)
+                edge_added = True
+                bound.update(zip(new_names, new_values))
+                used_values.update(new_values)
+                key[edge_index] = assignment_index
+                if filter_bound is None or filter_bound(bound, new_names):
+                    yield from extend(step + 1)
+                for name in new_names:
+                    del bound[name]
+                used_values.difference_update(new_values)
+                key[edge_index] = 0
+            # this is in case we couldnt merge any new assignment of an optional edge to the current merge,
+            # we simply continue with the merge as is (that is a left outer join)
+            if not edge_added and edge_is_optional:
+                yield from extend(step + 1)
+
+        if order == sorted(order):
+            yield from (merged for _, merged in extend(0))
+        else:
+            # the merges are found in the planned order, so sort back the (already filtered) merges
+            yield from (merged for _, merged in sorted(extend(0), key=lambda key_and_merged: key_and_merged[0]))
+
+    @staticmethod
+    def _merge_edges_assignments(edges_assignments: List[Tuple[bool, List[Dict[str, int]]]]) -> List[Dict[str, int]]:
+        return list(GlobalMatcher._iter_merges(edges_assignments))
 
     def apply(self, matches: Mapping[str, List[int]], sentence: Sequence[BartToken]) \
             -> Generator[MatchingResult, None, None]:
-        filtered = self._filter_edge_constraints(matches, sentence)
-        merges = self._merge_edges_assignments(filtered)
-
-        for merged_assignment in merges:
-            # TODO - compare the speed of non-edge filtering here to the on-going edge filter (see previous todo)
-            if self._filter_distance_constraints(merged_assignment) and \
-                    self._filter_concat_constraints(merged_assignment, sentence):
-                # keep only required captures
-                _ = [merged_assignment.pop(name, None) for name in self.dont_capture_names]
-                captured_labels = {(v1, v2): labels for (k1, v1, k2, v2), labels in self.captured_labels.items()
-                                   if k1 in merged_assignment and merged_assignment[k1] == v1 and
-                                   k2 in merged_assignment and merged_assignment[k2] == v2}
-                # append assignment to output
-                yield MatchingResult(merged_assignment, captured_labels)
+        # labels captured by this matching alone (so nothing is kept between calls),
+        #   stored according to the (name, index, name, index) of the edge
+        captured_labels = defaultdict(set)
+        filtered = self._filter_edge_constraints(matches, sentence, captured_labels)
+
+        # the distance and concat filters are applied during the merging, as soon as their tokens are bound
+        def filter_bound(match: Mapping[str, int], names: Sequence[str]) -> bool:
+            return self._filter_distance_constraints(match, names) and \
+                self._filter_concat_constraints(match, sentence, names)
+
+        for merged_assignment in self._iter_merges(filtered, filter_bound):
+            # keep only required captures
+            _ = [merged_assignment.pop(name, None) for name in self.dont_capture_names]
+            # look up the labels captured for the edges of the match (rather than scanning all captured labels)
+            indices2label = dict()
+            for edge in self.constraint.edges:
+                if edge.child in merged_assignment and edge.parent in merged_assignment:
+                    edge_key = (edge.child, merged_assignment[edge.child], edge.parent, merged_assignment[edge.parent])
+                    if edge_key in captured_labels:
+                        indices2label[edge_key[1], edge_key[3]] = captured_labels[edge_key]
+            # append assignment to output
+            yield MatchingResult(merged_assignment, indices2label)
 
 
 class TokenMatcher:
@@ -247,14 +369,9 @@ class TokenMatcher:
             if not field_cons:
                 matched_tokens[con_name] = list(range(len(sentence)))
                 continue
-            for i, tok in enumerate(sentence):
-                satisfied_tok = True
-                for field_con in field_cons:
-                    if not field_con.satisfied(tok, get_content_by_field):
-                        satisfied_tok = False
-                        break
-                if satisfied_tok:
-                    matched_tokens[con_name].append(i)
+            satisfied_tokens = get_tokens_by_fields(sentence, field_cons)
+            if satisfied_tokens:
+                matched_tokens[con_name] = satisfied_tokens
 
         return matched_tokens
 
@@ -272,26 +389,106 @@ class TokenMatcher:
         return matched_tokens
 
 
+# the labels and field values that a sentence must have for a constraint to match it: for each of the lists,
+#   at least one of its labels (or field values) should appear in the sentence.
+#   Checking this against the sentence index is much cheaper than matching, and rules out most of the constraints.
+class ConstraintSignature(NamedTuple):
+    labels: List[List[str]]
+    fields: List[Tuple[str, List[str]]]
+
+    def satisfiable(self, sentence: Sequence[BartToken]) -> bool:
+        index = get_sentence_index(sentence)
+        return all(index.has_any_label(labels) for labels in self.labels) and \
+            all(index.has_any_field_value(field_name, values) for field_name, values in self.fields)
+
+
+def get_required_labels(label_constraints: Sequence[LabelPresence]) -> List[List[str]]:
+    return [list(label.value) for label in label_constraints if isinstance(label, HasLabelFromList) and not label.is_regex]
+
+
+# collects the requirements of the (preprocessed) constraint, that the token and global matchers would enforce anyway:
+#   the spec, incoming and outgoing labels of the required tokens, and the labels of the required edges.
+def get_constraint_signature(constraint: Full) -> ConstraintSignature:
+    labels = []
+    fields = []
+    for token in constraint.tokens:
+        if token.optional:
+            continue
+        labels.extend(get_required_labels(token.incoming_edges) + get_required_labels(token.outgoing_edges))
+        fields.extend((field_by_field[field_con.field], list(field_con.value)) for field_con in token.spec
+                      if field_con.in_sequence and field_con.field in field_by_field)
+    for edge in constraint.edges:
+        if not edge.optional:
+            labels.extend(get_required_labels(edge.label))
+    return ConstraintSignature(labels, fields)
+
+
+# returns the base labels that the matching of the (preprocessed) constraint depends on, or None if it could be
+#   affected by any change of the sentence edges (e.g. a no_children constraint or an edge with any label).
+def get_constraint_dependencies(constraint: Full) -> Optional[Set[str]]:
+    if any(token.no_children for token in constraint.tokens) or \
+            any(not get_required_labels(edge.label) for edge in constraint.edges):
+        return None
+    labels = set()
+    for label in [label for edge in constraint.edges for label in edge.label] + \
+            [label for token in constraint.tokens for label in list(token.incoming_edges) + list(token.outgoing_edges)]:
+        if isinstance(label, HasNoLabel):
+            labels.add(label.value)
+        elif isinstance(label, HasLabelFromList) and not label.is_regex:
+            labels.update(label.value)
+        else:
+            return None
+    return labels
+
+
+# the per-sentence side of the matching process. It is cheap to create, and holds all the state that is gathered
+#   while matching a specific sentence, so the (compiled) token and global matchers can be shared between sentences.
 class Match:
     def __init__(self, token_matchers: Mapping[str, TokenMatcher],
-                 global_matchers: Mapping[str, GlobalMatcher], sentence: Sequence[BartToken]):
+                 global_matchers: Mapping[str, GlobalMatcher], sentence: Sequence[BartToken],
+                 signatures: Optional[Mapping[str, ConstraintSignature]] = None,
+                 dependencies: Optional[Mapping[str, Optional[Set[str]]]] = None):
         assert token_matchers.keys() == global_matchers.keys()
         self.token_matchers = token_matchers
         self.global_matchers = global_matchers
         self.sentence = sentence
+        self.signatures = signatures if signatures is not None else dict()
+        self.dependencies = dependencies if dependencies is not None else dict()
+        # per constraint-name, the sentence index changes count at the time it was matched without any result,
+        #   so it is matched again only after a change that it depends on.
+        self.unmatched_at = dict()
 
     def names(self) -> List[str]:
         # return constraint-name list
         return list(self.token_matchers.keys())
 
     def matches_for(self, name: str) -> Generator[MatchingResult, None, None]:
+        index = get_sentence_index(self.sentence)
+        # skip constraints that had no match, if nothing they depend on has changed since
+        if name in self.unmatched_at and \
+                not index.changed_since(self.unmatched_at[name], self.dependencies.get(name)):
+            return
+        changes = index.changes
+        self.unmatched_at.pop(name, None)
+
+        # skip constraints that require labels/fields that the sentence doesn't have
+        if name in self.signatures and not self.signatures[name].satisfiable(self.sentence):
+            self.unmatched_at[name] = changes
+            return
+
         # token match
         matches = self.token_matchers[name].apply(self.sentence)
         if matches is None:
+            self.unmatched_at[name] = changes
             return
 
         # filter
-        yield from self.global_matchers[name].apply(matches, self.sentence)
+        matched = False
+        for match in self.global_matchers[name].apply(matches, self.sentence):
+            matched = True
+            yield match
+        if not matched:
+            self.unmatched_at[name] = changes
 
 
 class NamedConstraint(NamedTuple):
@@ -344,10 +541,14 @@ def preprocess_constraint(constraint: Full) -> Full:
     return replace(constraint, tokens=tokens)
 
 
+# the compiled form of a set of constraints. It holds no per-sentence state, so it should be built once
+#   (per conversion set) and then be applied on any number of sentences.
 class Matcher:
     def __init__(self, constraints: Sequence[NamedConstraint]):
         self.token_matchers = dict()
         self.global_matchers = dict()
+        self.signatures = dict()
+        self.dependencies = dict()
         for constraint in constraints:
             # preprocess the constraints (optimizations)
             preprocessed_constraint = preprocess_constraint(constraint.constraint)
@@ -355,7 +556,9 @@ class Matcher:
             # initialize internal matchers
             self.token_matchers[constraint.name] = TokenMatcher(preprocessed_constraint.tokens)
             self.global_matchers[constraint.name] = GlobalMatcher(preprocessed_constraint)
+            self.signatures[constraint.name] = get_constraint_signature(preprocessed_constraint)
+            self.dependencies[constraint.name] = get_constraint_dependencies(preprocessed_constraint)
 
-    # apply the matching process on a given sentence
+    # start the matching process of a given sentence
     def __call__(self, sentence: Sequence[BartToken]) -> Match:
-        return Match(self.token_matchers, self.global_matchers, sentence)
+        return Match(self.token_matchers, self.global_matchers, sentence, self.signatures, self.dependencies)
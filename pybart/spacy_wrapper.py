@@ -1,31 +1,92 @@
 import struct
+from array import array
 from typing import Any, Dict
-import os
-import sys
 
 from spacy.tokens import Doc, Token as SpacyToken
 from spacy.tokens.graph import Graph
 
+from .converter import Convert
 from .graph_token import Token, add_basic_edges, TokenId
 
 JsonObject = Dict[str, Any]
 
 
+# the converted graphs are stored per doc in its user_data, in one array-backed structure: the number of nodes of each
+#   sentence's graph (its tokens followed by the nodes that were added to it), the offsets of each sentence's edges,
+#   and the head node, tail node and label of each edge. The labels are indices into the doc's distinct labels,
+#   which are interned in the vocab once. Unlike Graph objects, these are serialized with the doc (e.g. when passed
+#   between the processes of nlp.pipe), and the extensions below are built from them on access.
+GRAPHS_KEY = "pybart_graphs"
+ADDED_NODES_KEY = "pybart_added_nodes"
+LAZY_CONFIG_KEY = "pybart_lazy_config"
+GRAPHS_ARRAYS = ("nodes", "edge_offsets", "heads", "tails", "labels")
+
+
+def convert_lazily(doc):
+    # a doc of a lazy converter holds only the conversion configuration, and is converted the first time its graphs
+    #   are accessed (all of its sentences by a single run, as the eager conversion does, so the results are the same)
+    config = doc.user_data.get(LAZY_CONFIG_KEY)
+    if config is not None:
+        con = Convert([parse_spacy_sent(sent) for sent in doc.sents], *config)
+        converted, _ = con()
+        enhance_to_spacy_doc(doc, converted, config[4], config[5])
+        # (the doc may have been converted concurrently by another thread, with the same result)
+        doc.user_data.pop(LAZY_CONFIG_KEY, None)
+
+
+def get_graphs_arrays(doc):
+    convert_lazily(doc)
+    graphs = doc.user_data.get(GRAPHS_KEY)
+    if graphs is None:
+        return None
+    arrays = []
+    for name in GRAPHS_ARRAYS:
+        arrays.append(array("I"))
+        arrays[-1].frombytes(graphs[name])
+    return arrays, graphs["label_names"]
+
+
+def get_parent_graphs_per_sent(doc):
+    graphs = get_graphs_arrays(doc)
+    if graphs is None:
+        return []
+    (nodes, edge_offsets, heads, tails, labels), label_names = graphs
+    return [Graph(doc, name="pybart", nodes=[(idx,) for idx in range(nodes_count)],
+                  edges=list(zip(heads[edge_offsets[i]: edge_offsets[i + 1]], tails[edge_offsets[i]: edge_offsets[i + 1]])),
+                  labels=[label_names[label] for label in labels[edge_offsets[i]: edge_offsets[i + 1]]])
+            for i, nodes_count in enumerate(nodes)]
+
+
+def get_added_nodes(doc):
+    convert_lazily(doc)
+    return [{idx: name for idx, name in added_nodes} for added_nodes in doc.user_data.get(ADDED_NODES_KEY, [])]
+
+
 # this is here because it needs to happen only once (per import)
-Doc.set_extension("parent_graphs_per_sent", default=[])
-Doc.set_extension("added_nodes", default=[])
+Doc.set_extension("parent_graphs_per_sent", getter=get_parent_graphs_per_sent)
+Doc.set_extension("added_nodes", getter=get_added_nodes)
+
+
+def get_edges_per_sent(doc):
+    # the (head node, tail node, label) edges of each sentence's graph, as stored in the doc (without building Graph objects)
+    graphs = get_graphs_arrays(doc)
+    if graphs is None:
+        return []
+    (_, edge_offsets, heads, tails, labels), label_names = graphs
+    return [[(heads[k], tails[k], label_names[labels[k]]) for k in range(edge_offsets[i], edge_offsets[i + 1])] for i in range(len(edge_offsets) - 1)]
 
 
 def get_pybart(doc):
     ret = []
-    for i, (graph, sent) in enumerate(zip(doc._.parent_graphs_per_sent, doc.sents)):
+    added_nodes = doc._.added_nodes
+    for i, (edges, sent) in enumerate(zip(get_edges_per_sent(doc), doc.sents)):
         offset = sent[0].i
         ret.append([])
-        for edge in graph.edges:
+        for head, tail, label in edges:
             ret[i].append({
-                "head": doc[edge.head.i + offset] if edge.head.i < len(sent) else doc._.added_nodes[i][edge.head.i],
-                "tail": doc[edge.tail.i + offset] if edge.tail.i < len(sent) else doc._.added_nodes[i][edge.tail.i],
-                "label": edge.label_
+                "head": doc[head + offset] if head < len(sent) else added_nodes[i][head],
+                "tail": doc[tail + offset] if tail < len(sent) else added_nodes[i][tail],
+                "label": label
             })
     return ret
 
@@ -34,15 +95,15 @@ Doc.set_extension("get_pybart", method=get_pybart)
 
 
 def enhance_spike_doc(doc: Doc, spike_doc: JsonObject) -> JsonObject:
-    converted_graphs = doc._.parent_graphs_per_sent
+    edges_per_sent = get_edges_per_sent(doc)
     for idx, sent in enumerate(spike_doc["sentences"]):
         sent["graphs"]["universal-enhanced"] = {"edges": [], "roots": []}
-        for edge in converted_graphs[idx].edges:
-            if edge.label_.lower().startswith("root"):
-                sent["graphs"]["universal-enhanced"]["roots"].append(edge.tail.i)  # assume we have only one token per graph node
+        for head, tail, label in edges_per_sent[idx]:
+            if label.lower().startswith("root"):
+                sent["graphs"]["universal-enhanced"]["roots"].append(tail)  # assume we have only one token per graph node
             else:
                 sent["graphs"]["universal-enhanced"]["edges"].append(
-                    {"source": edge.head.i, "destination": edge.tail.i, "relation": edge.label_})
+                    {"source": head, "destination": tail, "relation": label})
         # sort the roots and edges for consistency purposes
         sent["graphs"]["universal-enhanced"]["roots"] = sorted(sent["graphs"]["universal-enhanced"]["roots"])
         sent["graphs"]["universal-enhanced"]["edges"] = sorted(sent["graphs"]["universal-enhanced"]["edges"],
@@ -75,35 +136,37 @@ def parse_spacy_sent(sent):
 
 
 def enhance_to_spacy_doc(orig_doc, converted_sentences, remove_enhanced_extra_info, remove_bart_extra_info):
+    arrays = {name: array("I") for name in GRAPHS_ARRAYS}
+    arrays["edge_offsets"].append(0)
+    label_indices = dict()
+    all_added_nodes = []
     for sent_idx, (orig_span, converted_sentence) in enumerate(zip(orig_doc.sents, converted_sentences)):
         added_counter = 0
         node_indices_map = dict()
-        nodes = []
-        edges = []
-        labels = []
-        orig_doc._.added_nodes.append(dict())
+        added_nodes = []
         converted_sentence = [tok for tok in converted_sentence if tok.get_conllu_field("id") != '0']
         for idx, tok in enumerate(converted_sentence):
             new_id = tok.get_conllu_field("id")
             node_indices_map[new_id.token_str] = idx
-            _ = nodes.append((idx,))
             if new_id.minor != 0:
-                orig_doc._.added_nodes[sent_idx][idx] = tok.get_conllu_field("form") + (f"_{added_counter}" if tok.get_conllu_field("form") == "STATE" else f"[COPY_NODE_{added_counter}]")
+                added_nodes.append((idx, tok.get_conllu_field("form") + (f"_{added_counter}" if tok.get_conllu_field("form") == "STATE" else f"[COPY_NODE_{added_counter}]")))
                 added_counter += 1
         for tok in converted_sentence:
             new_id = tok.get_conllu_field("id").token_str
             for head, rels in tok.get_new_relations():
                 for rel in rels:
                     head_id = head.get_conllu_field("id").token_str
-                    edges.append((
-                        node_indices_map[head_id if head_id != '0' else new_id],
-                        node_indices_map[new_id]
-                    ))
-                    _ = orig_doc.vocab[rel.to_str(remove_enhanced_extra_info, remove_bart_extra_info)]  # this will push the label into the vocab if it's not there
-                    labels.append(rel.to_str(remove_enhanced_extra_info, remove_bart_extra_info))
-
-        # Disable printing possibility: so graph creation wont print many lines
-        sys.stdout = open(os.devnull, 'w')
-        orig_doc._.parent_graphs_per_sent.append(Graph(orig_doc, name="pybart", nodes=nodes, edges=edges, labels=labels))
-        # Restore printing possibility
-        sys.stdout = sys.__stdout__
+                    arrays["heads"].append(node_indices_map[head_id if head_id != '0' else new_id])
+                    arrays["tails"].append(node_indices_map[new_id])
+                    label = rel.to_str(remove_enhanced_extra_info, remove_bart_extra_info)
+                    if label not in label_indices:
+                        label_indices[label] = len(label_indices)
+                        orig_doc.vocab.strings.add(label)  # this will push the label into the vocab if it's not there
+                    arrays["labels"].append(label_indices[label])
+
+        arrays["nodes"].append(len(converted_sentence))
+        arrays["edge_offsets"].append(len(arrays["heads"]))
+        all_added_nodes.append(added_nodes)
+
+    orig_doc.user_data[GRAPHS_KEY] = dict({name: values.tobytes() for name, values in arrays.items()}, label_names=list(label_indices))
+    orig_doc.user_data[ADDED_NODES_KEY] = all_added_nodes
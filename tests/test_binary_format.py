@@ -0,0 +1,35 @@
+import pathlib
+import pickle
+
+import pytest
+
+from pybart.conllu_wrapper import parse_conllu, serialize_conllu, conllu_to_odin
+from pybart.converter import Convert
+from pybart.binary_format import BinaryGraphs, write_graphs
+
+
+def test_binary_format_roundtrip(tmp_path):
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        parsed, all_comments = parse_conllu(f.read())
+    converted, _ = Convert(parsed, True, True, True, float("inf"), False, False, False, False, False, [])()
+    # copy nodes, alternatives ids and uncertain labels are all stored
+    assert any(token.get_conllu_field("id").minor for sentence in converted for token in sentence)
+    assert any(rel.iid is not None and rel.uncertain for sentence in converted for token in sentence for _, rels in token.get_new_relations() for rel in rels)
+    
+    write_graphs(str(tmp_path / "graphs.bin"), converted, all_comments)
+    with BinaryGraphs(str(tmp_path / "graphs.bin")) as graphs:
+        assert len(graphs) == len(converted)
+        loaded, loaded_comments = zip(*pickle.loads(pickle.dumps(graphs)))
+        assert list(loaded_comments) == all_comments
+        assert graphs[5][0][0].get_conllu_field("form") == converted[5][0].get_conllu_field("form")
+    
+    for remove_enhanced_extra_info, remove_bart_extra_info in [(False, False), (True, True), (False, True)]:
+        assert serialize_conllu(loaded, loaded_comments, remove_enhanced_extra_info, remove_bart_extra_info, True) == \
+               serialize_conllu(converted, all_comments, remove_enhanced_extra_info, remove_bart_extra_info, True)
+        loaded_odin, converted_odin = [conllu_to_odin(sentences, remove_enhanced_extra_info=remove_enhanced_extra_info, remove_bart_extra_info=remove_bart_extra_info)["documents"][""]
+                                       for sentences in [loaded, converted]]
+        assert (loaded_odin["text"], loaded_odin["sentences"]) == (converted_odin["text"], converted_odin["sentences"])
+    
+    (tmp_path / "other.bin").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        BinaryGraphs(str(tmp_path / "other.bin"))
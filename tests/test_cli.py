@@ -0,0 +1,37 @@
+import gzip
+import json
+import pathlib
+
+from pybart import api
+from pybart.cli import main
+
+
+def test_cli_conllu(tmp_path):
+    path = str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu"
+    with open(path) as f:
+        text = f.read()
+    (tmp_path / "in").mkdir()
+    with gzip.open(tmp_path / "in" / "a.conllu.gz", "wt") as f:
+        f.write(text)
+    (tmp_path / "in" / "b.conllu").write_text(text)
+    (tmp_path / "in" / "c.txt").write_text(text)
+    
+    assert main([str(tmp_path / "in"), "-o", str(tmp_path / "out"), "--preserve-comments", "--remove-extra-info", "--chunk-size", "7"]) == 0
+    expected = api.convert_bart_conllu(text, preserve_comments=True, remove_extra_info=True)
+    with gzip.open(tmp_path / "out" / "a.conllu.gz", "rt") as f:
+        assert f.read() == expected
+    assert (tmp_path / "out" / "b.conllu").read_text() == expected
+    assert not (tmp_path / "out" / "c.txt").exists()
+
+
+def test_cli_spike(tmp_path):
+    spike_sentence = {"words": ["He", "saw", "me", "and", "you"], "pos": ["PRP", "VBD", "PRP", "CC", "PRP"], "lemmas": ["he", "see", "me", "and", "you"],
+                      "graphs": {"universal-basic": {"edges": [{"parent": 1, "child": 0, "label": "nsubj"}, {"parent": 1, "child": 2, "label": "dobj"},
+                                                               {"parent": 4, "child": 3, "label": "cc"}, {"parent": 2, "child": 4, "label": "conj"}], "roots": [1]}}}
+    (tmp_path / "in.jsonl").write_text(json.dumps(spike_sentence) + "\n" + json.dumps({"sentences": [spike_sentence]}) + "\n")
+    
+    assert main([str(tmp_path / "in.jsonl"), "-o", str(tmp_path / "out.jsonl"), "-f", "spike"]) == 0
+    expected = api.convert_spike_sentence(json.loads(json.dumps(spike_sentence)))
+    sentence, doc = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert sentence == expected and doc == {"sentences": [expected]}
+    assert {"parent": 1, "child": 4, "label": "dobj"} in sentence["graphs"]["universal-enhanced"]["edges"]
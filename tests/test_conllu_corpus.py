@@ -0,0 +1,40 @@
+import pathlib
+import pickle
+
+from pybart import api
+from pybart.conllu_wrapper import parse_conllu
+from pybart.conllu_corpus import ConlluCorpus
+
+
+def test_conllu_corpus(tmp_path):
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        text = f.read()
+    path = tmp_path / "corpus.conllu"
+    # extra blank lines (also with whitespaces) between sentences and at the edges
+    path.write_text("\n\n" + text.replace("\n\n", "\n \n\n", 3) + "\n\n")
+    parsed, all_comments = parse_conllu(text)
+    
+    with ConlluCorpus(str(path), str(tmp_path / "corpus.idx")) as corpus:
+        assert len(corpus) == len(parsed)
+        for i in [0, 17, len(parsed) - 1]:
+            sentence, comments = corpus[i]
+            assert comments == all_comments[i]
+            assert [token.get_conllu_string(False, False) for token in sentence] == [token.get_conllu_string(False, False) for token in parsed[i]]
+        assert [sent.strip() for sent in corpus.iter_texts()] == [sent.strip() for sent in text.strip().split("\n\n")]
+        
+        shards = corpus.get_shards(3)
+        assert shards[0][0] == 0 and shards[-1][1] == len(corpus)
+        assert all(prev[1] == cur[0] and cur[0] < cur[1] for prev, cur in zip(shards, shards[1:]))
+        assert corpus.get_byte_range(*shards[1]) == (corpus.offsets[2 * shards[1][0]], corpus.offsets[2 * shards[1][1] - 1])
+        
+        # the index is reused by a reopened (e.g. unpickled) corpus
+        unpickled = pickle.loads(pickle.dumps(corpus))
+        assert unpickled.offsets == corpus.offsets
+        converted = "\n".join("\n".join(api.iter_convert_bart_conllu(unpickled.iter_lines(start, stop), preserve_comments=True)) for start, stop in shards)
+        assert converted == api.convert_bart_conllu(text, preserve_comments=True)
+        unpickled.close()
+    
+    # a modified file invalidates the index
+    path.write_text(text + "\n1\tOK\tok\tINTJ\tUH\t_\t0\troot\t_\t_\n")
+    with ConlluCorpus(str(path), str(tmp_path / "corpus.idx")) as corpus:
+        assert len(corpus) == len(parsed) + 1
@@ -1,9 +1,13 @@
 import pathlib
 import math
+import copy
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 #from pytest import fail
 
 import pybart
-from pybart.conllu_wrapper import parse_conllu, serialize_conllu
+from pybart.conllu_wrapper import parse_conllu, serialize_conllu, conllu_to_odin
 from pybart import converter
 from pybart import api
 from pybart.graph_token import add_basic_edges
@@ -89,3 +93,97 @@ for cur_func_name in api.get_conversion_names():
     setattr(TestConversions, test_func_name, staticmethod(lambda func_name=test_func_name: TestConversions.common_logic(func_name)))
     combined_func_name = "test_combined_" + cur_func_name
     setattr(TestConversions, combined_func_name, staticmethod(lambda func_name=combined_func_name: TestConversions.common_logic_combined(func_name)))
+
+
+def test_conversions_registry():
+    conversions, matcher = converter.get_initialized_conversions(False, 1)
+    assert converter.get_initialized_conversions(False, 1) == (conversions, matcher)
+    filtered = converter.get_filtered_conversions(True, True, True, False, False, False, False, ["eud_conj_info"], 1)
+    assert filtered is converter.get_filtered_conversions(True, True, True, False, False, False, False, ["eud_conj_info"], 1)
+    # filtering doesn't alter the shared conversions
+    assert "eud_conj_info" not in filtered and "eud_conj_info" in conversions
+
+
+def test_convert_in_workers():
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        text = f.read()
+    # the results are in the input order, and the iids are numbered as in a single run
+    assert api.convert_bart_conllu(text, preserve_comments=True, workers=2) == api.convert_bart_conllu(text, preserve_comments=True)
+
+
+def test_pickle_converter():
+    conversions, _ = converter.get_initialized_conversions(False, 1)
+    # registered conversions are pickled by reference
+    assert pickle.loads(pickle.dumps(conversions)) == conversions
+    assert pickle.loads(pickle.dumps(conversions["eud_conj_info"])) is conversions["eud_conj_info"]
+    con = api.Converter(remove_eud_info=True, funcs_to_cancel=["eud_conj_info"], is_spike_converter=True)
+    unpickled = pickle.loads(pickle.dumps(con))
+    assert unpickled.config == con.config and unpickled.is_spike_converter
+    assert unpickled.conversions is con.conversions and unpickled.matcher is con.matcher
+    # a worker which doesn't inherit the parent's memory rebuilds the converter from its config
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert executor.submit(len, [con]).result() == 1
+
+
+def test_iter_convert_conllu():
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        text = f.read()
+    expected = api.convert_bart_conllu(text, preserve_comments=True)
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        converted = api.iter_convert_bart_conllu(f, preserve_comments=True, chunk_size=7)
+        assert "\n".join(converted) == expected
+    assert "\n".join(api.iter_convert_bart_conllu(text.splitlines(), preserve_comments=True, chunk_size=7, workers=2)) == expected
+
+
+def get_odin_docs(parsed, sentences_per_doc):
+    docs = []
+    for i in range(0, len(parsed), sentences_per_doc):
+        doc = {"sentences": [], "text": ""}
+        for sentence in parsed[i: i + sentences_per_doc]:
+            tokens = [token for token in sentence if token.get_conllu_field("id").major != 0]
+            words = [token.get_conllu_field("form") for token in tokens]
+            start = len(doc["text"]) + 1 if doc["text"] else 0
+            doc["text"] += (" " if doc["text"] else "") + " ".join(words)
+            starts = [start + sum(len(word) + 1 for word in words[:j]) for j in range(len(words))]
+            doc["sentences"].append({
+                "words": words, "tags": [token.get_conllu_field("xpos") for token in tokens], "lemmas": [token.get_conllu_field("lemma") for token in tokens],
+                "startOffsets": starts, "endOffsets": [s + len(word) for s, word in zip(starts, words)],
+                "graphs": {"universal-basic": {
+                    "edges": [{"source": token.get_conllu_field("head").major - 1, "destination": j, "relation": token.get_conllu_field("deprel")}
+                              for j, token in enumerate(tokens) if token.get_conllu_field("head").major != 0],
+                    "roots": [j for j, token in enumerate(tokens) if token.get_conllu_field("head").major == 0]}}})
+        docs.append(doc)
+    return docs
+
+
+def test_iter_convert_odin():
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        text = f.read()
+    parsed, _ = parse_conllu(text)
+    docs = get_odin_docs(parsed, 20)
+    converted = list(api.iter_convert_bart_odin(copy.deepcopy(docs), workers=2))
+    assert converted == [api.convert_bart_odin(doc) for doc in copy.deepcopy(docs)]
+    assert api.convert_bart_odin({"documents": dict(enumerate(copy.deepcopy(docs)))}, workers=2)["documents"] == dict(enumerate(converted))
+    
+    # the graphs are the same as of the conversion of the CoNLL-U sentences
+    converted_conllu, _ = Convert(parse_conllu(text)[0][:20], True, True, True, math.inf, False, False, False, False, False, [])()
+    expected = conllu_to_odin(converted_conllu, None, False, False)["documents"][""]["sentences"]
+    assert [sent["graphs"]["universal-enhanced"] for sent in converted[0]["sentences"]] == [sent["graphs"]["universal-enhanced"] for sent in expected]
+
+
+def test_iter_convert_spike_sentences():
+    with open(str(pathlib.Path(__file__).parent.absolute()) + "/handcrafted_tests.conllu") as f:
+        parsed, _ = parse_conllu(f.read())
+    spike_sentences = []
+    for doc in get_odin_docs(parsed, 1):
+        sent = doc["sentences"][0]
+        spike_sentences.append({"words": sent["words"], "pos": sent["tags"], "lemmas": sent["lemmas"], "graphs": {"universal-basic": {
+            "edges": [{"parent": edge["source"], "child": edge["destination"], "label": edge["relation"]} for edge in sent["graphs"]["universal-basic"]["edges"]],
+            "roots": sent["graphs"]["universal-basic"]["roots"]}}})
+    spike_items = spike_sentences[:50] + [{"sentences": spike_sentences[50:]}]
+    expected = [api.convert_spike_sentence(spike_sentence) for spike_sentence in copy.deepcopy(spike_sentences)]
+    # the alternatives ids are numbered per sentence
+    assert any("#" in edge["label"] for sent in expected for edge in sent["graphs"]["universal-enhanced"]["edges"])
+    for workers in [1, 2]:
+        converted = list(api.iter_convert_spike_sentences(copy.deepcopy(spike_items), workers=workers, chunk_size=7))
+        assert converted == expected[:50] + [{"sentences": expected[50:]}]
@@ -3,7 +3,7 @@ import pytest
 from pybart.spacy_wrapper import parse_spacy_sent
 from pybart.matcher import *
 from pybart import matcher
-from pybart.graph_token import Token as BartToken, TokenId
+from pybart.graph_token import Token as BartToken, TokenId, Label
 
 
 def stub_get_text(stub_self, i):
@@ -22,7 +22,7 @@ def stub_get_labels(stub_self, child=0, parent=0):
         return []
 
 
-@pytest.fixture(scope="session", autouse=True)
+@pytest.fixture(scope="module", autouse=True)
 def cleanup(request):
     keep_get_text = matcher.get_text
     matcher.get_text = stub_get_text
@@ -52,6 +52,13 @@ sentences = [[BartToken(TokenId(1), "He", "he", "", "PRP", "", TokenId(2), "nsub
              ]
 
 
+def build_sentence(forms, edges):
+    sentence = [BartToken(TokenId(i + 1), form, "", "", "", "", None, "", "", "") for i, form in enumerate(forms)]
+    for child, parent, label in edges:
+        sentence[child].add_edge(Label(label), sentence[parent])
+    return sentence
+
+
 def init_full_constraints():
     some_constraint1 = Full(
         tokens=[Token("name1"), Token("name2"), Token("name3")],
@@ -191,33 +198,39 @@ class TestMatcher:
         assert gm._filter_concat_constraints({"tok1": 0, "tok2": 1}, sentences[0])
         assert not gm._filter_concat_constraints({"tok1": 0, "tok2": 2}, sentences[0])
 
-    def test_try_merge(self):
-        assert GlobalMatcher._try_merge({"a": 1, "b": 2, "c": 3}, {"b": 2, "c": 3, "d": 4}) == \
-            {"a": 1, "b": 2, "c": 3, "d": 4}
-        assert GlobalMatcher._try_merge({"a": 1, "b": 2, "c": 3}, {"b": 4, "c": 3, "d": 4}) == {}
+    def test_join_table(self):
+        table = GlobalMatcher._join_table(["a", "b"], [{"a": 1, "b": 2}, {"a": 1, "b": 3}])
+        assert table[((True, False), (1,))] == [(0, (1, 2)), (1, (1, 3))]
+        assert table[((True, True), (1, 3))] == [(1, (1, 3))]
+        assert ((False, True), (4,)) not in table
 
     def test_filter_edge_constraints(self):
         # no edge constraint
         gm = GlobalMatcher(Full())
         assert gm._filter_edge_constraints({}, None) == []
 
+        # token 1 is connected to token 2 with a bad label, and to the rest of the tokens with the required one
+        sentence = build_sentence(["test%d" % i for i in range(7)],
+                                  [(1, 2, "bad_label")] + [(1, parent, "some_label") for parent in [0, 3, 4, 5, 6]])
         gm = GlobalMatcher(Full(tokens=[Token("tok1"), Token("tok2")],
                                 edges=[Edge("tok1", "tok2", [HasLabelFromList(["some_label"])])]))
         # no children
-        assert gm._filter_edge_constraints({"tok2": [2]}, None) == []
+        assert gm._filter_edge_constraints({"tok2": [2]}, sentence) == []
         # no parents
-        assert gm._filter_edge_constraints({"tok1": [2]}, None) == []
+        assert gm._filter_edge_constraints({"tok1": [2]}, sentence) == []
+        # no actual edge between the candidates
+        assert gm._filter_edge_constraints({"tok1": [2], "tok2": [1]}, sentence) == []
         # get_matched_labels returns None (and that's it)
-        assert gm._filter_edge_constraints({"tok1": [1], "tok2": [2]}, sentences[0]) == []
+        assert gm._filter_edge_constraints({"tok1": [1], "tok2": [2]}, sentence) == []
         # get_matched_labels returns None (once, but there are more results)
-        assert gm._filter_edge_constraints({"tok1": [1], "tok2": [3, 4]}, sentences[0]) == \
+        assert gm._filter_edge_constraints({"tok1": [1], "tok2": [2, 3, 4]}, sentence) == \
                [(False, [{"tok1": 1, "tok2": 3}, {"tok1": 1, "tok2": 4}])]
 
         # more than one edge_assignments
         gm = GlobalMatcher(Full(tokens=[Token("tok1"), Token("tok2"), Token("tok3")], edges=[
             Edge("tok1", "tok2", [HasLabelFromList(["some_label"])]),
             Edge("tok1", "tok3", [HasLabelFromList(["some_label"])])]))
-        assert gm._filter_edge_constraints({"tok1": [1], "tok2": [3, 4], "tok3": [5, 6]}, sentences[0]) == \
+        assert gm._filter_edge_constraints({"tok1": [1], "tok2": [3, 4], "tok3": [5, 6]}, sentence) == \
                [(False, [{"tok1": 1, "tok2": 3}, {"tok1": 1, "tok2": 4}]), (False, [{"tok1": 1, "tok3": 5}, {"tok1": 1, "tok3": 6}])]
 
     def test_merge_edges_assignments(self):
@@ -238,6 +251,35 @@ class TestMatcher:
             [{"a": 1, "b": 3, "c": 6, "d": 11, "e": 100, "f": 200},
              {"a": 1, "b": 3, "c": 6, "d": 2, "e": 100, "f": 200},
              {"a": 4, "b": 5, "c": 8, "d": 1000, "e": 100, "f": 200}]
+        # an optional edge extends the merges it can, and keeps the others as they are
+        assert GlobalMatcher._merge_edges_assignments([
+            (False, [{"a": 1, "b": 2}, {"a": 3, "b": 4}]),
+            (True, [{"b": 2, "c": 5}, {"b": 2, "c": 6}, {"b": 7, "c": 8}, {"b": 4, "c": 3}])]) == \
+            [{"a": 1, "b": 2, "c": 5}, {"a": 1, "b": 2, "c": 6}, {"a": 3, "b": 4}]
+
+    def test_plan_merge_order(self):
+        # the smallest connected required edges go first, while optional edges stay in place
+        assert GlobalMatcher._plan_merge_order([
+            (False, [{"a": 1, "b": 2}, {"a": 1, "b": 3}, {"a": 4, "b": 5}]),
+            (False, [{"c": 10, "d": 11}]),
+            (False, [{"b": 3, "c": 6}, {"b": 5, "c": 8}]),
+            (True, [{"d": 11, "e": 12}]),
+            (False, [{"e": 12, "f": 13}, {"e": 14, "f": 15}]),
+            (False, [{"f": 13, "g": 16}])]) == [1, 2, 0, 3, 4, 5]
+
+    def test_iter_merges(self):
+        edges_assignments = [(False, [{"a": 1, "b": 2}, {"a": 3, "b": 4}]), (True, [{"b": 2, "c": 5}, {"b": 4, "c": 6}])]
+        checked = []
+
+        def filter_bound(match, names):
+            checked.append(list(names))
+            return match.get("c") != 5
+
+        merges = GlobalMatcher._iter_merges(edges_assignments, filter_bound)
+        assert next(merges) == {"a": 3, "b": 4, "c": 6}
+        # merges are found lazily, and an optional extension that is filtered doesn't fall back to the unextended merge
+        assert checked == [["a", "b"], ["c"], ["a", "b"], ["c"]]
+        assert list(merges) == []
 
     def test_gm_apply(self):
         # no merges
@@ -250,7 +292,10 @@ class TestMatcher:
                                 distances=[ExactDistance("tok1", "tok2", 10)]))
         assert len(list(gm.apply({"tok1": [1], "tok2": [3]}, sentences[0]))) == 0
         # sanity (but have redundant token names so we can validate they are filtered)
-        for res in gm.apply({"tok1": [1], "tok2": [12], "tok3": [2]}, sentences[0]):
+        sentence = build_sentence(["test%d" % i for i in range(13)], [(1, 12, "some_label"), (1, 2, "some_label")])
+        results = list(gm.apply({"tok1": [1], "tok2": [12], "tok3": [2]}, sentence))
+        assert len(results) == 1
+        for res in results:
             assert res.edge(1, 12) == {"some_label"}
             assert res.token("tok1") == 1
             assert res.token("tok2") == 12
@@ -282,6 +327,27 @@ class TestMatcher:
                            Token("verb", spec=[Field(FieldNames.TAG, ["VBD", "VB"])])])
         assert {"tok1": [0], "verb": [1, 3]} == tm.apply(sentences[2])
 
+    def test_sentence_index(self):
+        sentence = build_sentence(["test1", "went", "test3"], [(0, 1, "some_label"), (2, 1, "other_label")])
+        index = get_sentence_index(sentence)
+        assert get_sentence_index(sentence) is index
+        assert sorted(index.edge_positions("some_label")) == [(0, 1)]
+        assert set(index.outgoing_labels(1)) == {"some_label", "other_label"}
+        # the index follows edge changes and appended (copy) nodes
+        sentence[0].remove_edge(Label("some_label"), sentence[1])
+        sentence.append(sentence[1].copy(form="went"))
+        sentence[3].add_edge(Label("some_label"), sentence[2])
+        assert index.edge_positions("some_label") == [(3, 2)]
+        assert set(index.outgoing_labels(1)) == {"other_label"}
+        assert index.positions_by_field("form", ["went"]) == {1, 3}
+        assert index.positions_by_field("form", ["went"], in_values=False) == {0, 2}
+        # the edges state is back to the same value once the edges are back to the same set
+        edges_state = index.edges_state()
+        sentence[0].add_edge(Label("some_label", eud="by"), sentence[2])
+        assert index.edges_state() != edges_state
+        sentence[0].remove_edge(Label("some_label", eud="by"), sentence[2])
+        assert index.edges_state() == edges_state
+
 
 class TestMatch:
     def test_matched_for(self):
@@ -297,7 +363,7 @@ class TestMatch:
             {"constraint1": GlobalMatcher(constraint),
              "constraint2": GlobalMatcher(constraint2),
              "constraint3": GlobalMatcher(constraint3)},
-            sentences[3])
+            build_sentence(["He", "went", "home"], [(0, 2, "some_label")]))
         assert len(list(match.matches_for("constraint1"))) == 0
         assert len(list(match.matches_for("constraint2"))) == 0
         assert len(list(match.matches_for("constraint3"))) == 1
@@ -306,6 +372,51 @@ class TestMatch:
             assert m.token("tok2") == 2
             assert m.edge(0, 2) == {"some_label"}
 
+    def test_per_sentence_state(self):
+        matcher = Matcher([NamedConstraint("constraint1", Full(
+            tokens=[Token("tok2"), Token("tok1", spec=[Field(FieldNames.WORD, ["went"])])],
+            edges=[Edge("tok1", "tok2", [HasLabelFromList(["some_label"])])]))])
+        sentence = build_sentence(["test1", "went", "test3", "test4"], [(1, 3, "some_label")])
+        match = matcher(sentence)
+        results = list(match.matches_for("constraint1"))
+        assert len(results) == 1 and results[0].edge(1, 3) == {"some_label"}
+        # captures are kept per matching, so nothing is left in the shared matcher or in the match
+        assert not hasattr(matcher.global_matchers["constraint1"], "captured_labels")
+        assert not hasattr(match, "captured_labels")
+        sentence[1].remove_edge(Label("some_label"), sentence[3])
+        sentence[1].add_edge(Label("other_label"), sentence[3])
+        assert len(list(match.matches_for("constraint1"))) == 0
+
+
+    def test_rematch_on_change(self):
+        matcher = Matcher([NamedConstraint("constraint1", Full(
+            tokens=[Token("tok1"), Token("tok2")], edges=[Edge("tok1", "tok2", [HasLabelFromList(["some_label"])])]))])
+        assert matcher.dependencies["constraint1"] == {"some_label"}
+        sentence = build_sentence(["test1", "test2", "test3"], [(0, 1, "other_label")])
+        match = matcher(sentence)
+        assert len(list(match.matches_for("constraint1"))) == 0
+        unmatched_at = match.unmatched_at["constraint1"]
+        # an unrelated change doesn't trigger a new matching, while a related one does
+        sentence[2].add_edge(Label("other_label"), sentence[1])
+        assert len(list(match.matches_for("constraint1"))) == 0
+        assert match.unmatched_at["constraint1"] == unmatched_at
+        sentence[1].add_edge(Label("some_label"), sentence[2])
+        assert len(list(match.matches_for("constraint1"))) == 1
+        assert "constraint1" not in match.unmatched_at
+
+    def test_signature(self):
+        constraint = Full(tokens=[Token("tok1", spec=[Field(FieldNames.WORD, ["went"])]),
+                                  Token("tok2", optional=True, spec=[Field(FieldNames.WORD, ["gone"])]),
+                                  Token("tok3", incoming_edges=[HasLabelFromList(["other_label"])])],
+                          edges=[Edge("tok1", "tok3", [HasLabelFromList(["some_label"])]),
+                                 Edge("tok2", "tok3", [HasLabelFromList(["extra_label"])])])
+        signature = get_constraint_signature(constraint)
+        assert signature == ConstraintSignature([["other_label"], ["some_label"]], [("form", ["went"])])
+        sentence = build_sentence(["test1", "went", "test3"], [(1, 2, "some_label")])
+        assert not signature.satisfiable(sentence)
+        sentence[0].add_edge(Label("other_label"), sentence[2])
+        assert signature.satisfiable(sentence)
+
 
 def test_preprocess_constraint():
     ret = preprocess_constraint(Full(
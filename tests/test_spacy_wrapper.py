@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from pybart.api import Converter
+
+ANNOTATIONS = {
+    "He saw me while driving .": dict(heads=[1, 1, 1, 4, 1, 1], deps=["nsubj", "ROOT", "dobj", "mark", "advcl", "punct"],
+                                      tags=["PRP", "VBD", "PRP", "IN", "VBG", "."], pos=["PRON", "VERB", "PRON", "SCONJ", "VERB", "PUNCT"],
+                                      lemmas=["he", "see", "I", "while", "drive", "."]),
+    "She bought and ate apples .": dict(heads=[1, 1, 3, 1, 1, 1], deps=["nsubj", "ROOT", "cc", "conj", "dobj", "punct"],
+                                        tags=["PRP", "VBD", "CC", "VBD", "NNS", "."], pos=["PRON", "VERB", "CCONJ", "VERB", "NOUN", "PUNCT"],
+                                        lemmas=["she", "buy", "and", "eat", "apple", "."]),
+}
+
+
+@Language.component("annotate_test_sentences")
+def annotate_test_sentences(doc):
+    # a stand-in for a UD parser, which annotates the known sentences of the doc
+    words, annotations = [], dict(heads=[], deps=[], tags=[], pos=[], lemmas=[])
+    for sentence, sentence_annotations in ANNOTATIONS.items():
+        if sentence in doc.text:
+            for name, values in sentence_annotations.items():
+                annotations[name].extend([value + len(words) for value in values] if name == "heads" else values)
+            words.extend(sentence.split())
+    return Doc(doc.vocab, words=words, **annotations)
+
+
+def get_nlp(**config):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("annotate_test_sentences")
+    nlp.add_pipe("pybart_spacy_pipe", config=config)
+    return nlp
+
+
+def get_edges(doc):
+    return [[(str(edge["head"]), edge["label"], str(edge["tail"])) for edge in sent] for sent in doc._.get_pybart()]
+
+
+TEXTS = ["He saw me while driving .", "She bought and ate apples .", "He saw me while driving . She bought and ate apples ."] * 3
+
+
+def test_pipe():
+    nlp = get_nlp()
+    expected = [get_edges(nlp(text)) for text in TEXTS]
+    assert ("driving", "nsubj@advcl(while)#0", "He") in expected[0][0]
+    assert [get_edges(doc) for doc in nlp.pipe(TEXTS, batch_size=4)] == expected
+    assert [get_edges(doc) for doc in nlp.pipe(TEXTS, batch_size=4, n_process=2)] == expected
+
+
+def test_per_doc_graphs():
+    nlp = get_nlp()
+    first, second = nlp(TEXTS[0]), nlp(TEXTS[2])
+    assert len(first._.parent_graphs_per_sent) == 1 and len(second._.parent_graphs_per_sent) == 2
+    assert get_edges(first) == get_edges(second)[:1]
+    # the graphs are serialized with the doc
+    assert get_edges(Doc(nlp.vocab).from_bytes(second.to_bytes())) == get_edges(second)
+
+
+def test_docs_dont_share_graphs():
+    nlp = get_nlp()
+    docs = [nlp(text) for text in TEXTS]
+    assert [len(doc._.get_pybart()) for doc in docs] == [len(list(doc.sents)) for doc in docs]
+    assert docs[0].user_data["pybart_graphs"] is not docs[1].user_data["pybart_graphs"]
+    # a doc that wasn't converted has no graphs
+    assert nlp.make_doc(TEXTS[0])._.get_pybart() == []
+    
+    spike_doc = {"sentences": [{"graphs": {}}, {"graphs": {}}]}
+    docs[2]._.enhance_spike_doc(spike_doc)
+    graph = docs[2]._.parent_graphs_per_sent[1]
+    assert spike_doc["sentences"][1]["graphs"]["universal-enhanced"] == {
+        "edges": sorted([{"source": edge.head.i, "destination": edge.tail.i, "relation": edge.label_} for edge in graph.edges if edge.label_ != "root"],
+                        key=lambda x: (x['source'], x['destination'], x['relation'])),
+        "roots": [1]}
+
+
+def test_lazy_conversion():
+    nlp, lazy_nlp = get_nlp(), get_nlp(lazy=True)
+    expected = [get_edges(nlp(text)) for text in TEXTS]
+    docs = list(lazy_nlp.pipe(TEXTS, batch_size=4))
+    # nothing is converted before the graphs are accessed
+    assert all("pybart_graphs" not in doc.user_data for doc in docs)
+    assert get_edges(docs[2]) == expected[2]
+    assert "pybart_graphs" in docs[2].user_data and "pybart_lazy_config" not in docs[2].user_data
+    assert "pybart_graphs" not in docs[0].user_data
+    assert [get_edges(doc) for doc in docs] == expected
+    # the conversion configuration is serialized with the doc, so a doc converts lazily in another process too
+    assert [get_edges(doc) for doc in lazy_nlp.pipe(TEXTS, batch_size=4, n_process=2)] == expected
+    assert get_edges(Doc(lazy_nlp.vocab).from_bytes(lazy_nlp(TEXTS[2]).to_bytes())) == expected[2]
+
+
+def test_shared_between_threads():
+    nlp = get_nlp()
+    converter = nlp.get_pipe("pybart_spacy_pipe")
+    expected = [get_edges(nlp(text)) for text in TEXTS]
+    with ThreadPoolExecutor(4) as executor:
+        assert list(executor.map(lambda text: get_edges(nlp(text)), TEXTS * 10)) == expected * 10
+        # each call returns its own results
+        with nlp.select_pipes(disable=["pybart_spacy_pipe"]):
+            docs = list(nlp.pipe(TEXTS))
+        results = list(executor.map(converter.convert, docs))
+    assert [len(converted_sents) for converted_sents, _ in results] == [len(list(doc.sents)) for doc in docs]
+    assert [get_edges(doc) for doc in docs] == expected